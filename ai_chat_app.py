@@ -1,16 +1,14 @@
-import os
 import streamlit as st
 import openai
-from dotenv import load_dotenv
+from llm_client import get_client
+from chat_history import MODEL_CONTEXT_BUDGETS, DEFAULT_CONTEXT_BUDGET, build_context
 
-load_dotenv()
-API_KEY = os.getenv("API_KEY")
+# Shared OpenAI client (created once per process, reused across reruns)
+client = get_client()
 
-# Initialize OpenAI client
-client = openai.OpenAI(
-    api_key=API_KEY,
-    base_url="https://api.poe.com/v1",
-)
+# Status codes with which providers reject stream=True; other errors (auth,
+# rate limits, 5xx) are not retried with a second, blocking request
+STREAM_UNSUPPORTED_STATUS = (400, 404, 422)
 
 # Page configuration
 st.set_page_config(page_title="AI Chat App", page_icon="💬", layout="wide")
@@ -61,10 +59,47 @@ with st.sidebar:
         index=0
     )
     
+    # History budget for the chosen model
+    st.subheader("Conversation Memory")
+    context_budget = st.number_input(
+        "Token budget per request:",
+        min_value=500,
+        max_value=200000,
+        value=MODEL_CONTEXT_BUDGETS.get(model, DEFAULT_CONTEXT_BUDGET),
+        step=500,
+        key=f"context_budget_{model}",
+        help="Older messages are summarised or dropped to stay under this budget"
+    )
+    keep_turns = st.slider(
+        "Recent turns always sent:",
+        min_value=1,
+        max_value=20,
+        value=4,
+        help="The last N question/answer pairs are sent word for word"
+    )
+    summarize_older = st.checkbox(
+        "Summarise older turns",
+        value=True,
+        help="If unchecked, older turns that do not fit are dropped"
+    )
+    # Updated again below once this run's request (if any) is built
+    tokens_metric = st.empty()
+    if st.session_state.get("last_request_tokens"):
+        tokens_metric.metric("Tokens sent (last request)", st.session_state.last_request_tokens)
+    
+    # Response mode
+    stream_responses = st.toggle(
+        "Stream responses",
+        value=True,
+        help="Show the answer word by word as it is generated"
+    )
+    
     # Clear chat button
     st.divider()
     if st.button("🗑️ Clear Chat", use_container_width=True):
         st.session_state.messages = []
+        # Drop a reply that was still streaming, so it isn't added back below
+        st.session_state.partial_response = None
         st.rerun()
 
 # Main chat interface
@@ -75,6 +110,48 @@ st.caption("Chat with an AI assistant. Customize its personality using the sideb
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# Text received so far from a stream that is still running. If the script is
+# rerun while streaming (Stop button or any other click), keep what we got.
+if "partial_response" not in st.session_state:
+    st.session_state.partial_response = None
+
+if st.session_state.partial_response is not None:
+    st.session_state.messages.append({
+        "role": "assistant",
+        "content": st.session_state.partial_response + "\n\n*(stopped)*"
+    })
+    st.session_state.partial_response = None
+
+
+def stream_completion(model, api_messages, placeholder):
+    """Write the answer into `placeholder` chunk by chunk and return the full text."""
+    stream = client.chat.completions.create(
+        model=model,
+        messages=api_messages,
+        stream=True
+    )
+    chunks = []
+    st.session_state.partial_response = ""
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            chunks.append(delta)
+            st.session_state.partial_response = "".join(chunks)
+            placeholder.markdown(st.session_state.partial_response + "▌")
+    st.session_state.partial_response = None
+    return "".join(chunks)
+
+
+def blocking_completion(model, api_messages):
+    response = client.chat.completions.create(
+        model=model,
+        messages=api_messages,
+        stream=False
+    )
+    return response.choices[0].message.content
+
 # Display chat messages
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -87,33 +164,53 @@ if prompt := st.chat_input("Type your message here..."):
     with st.chat_message("user"):
         st.markdown(prompt)
     
-    # Prepare messages for API call
-    api_messages = []
-    
-    # Add system prompt if provided
-    if system_prompt and system_prompt.strip():
-        api_messages.append({"role": "system", "content": system_prompt.strip()})
-    
-    # Add conversation history
-    for msg in st.session_state.messages:
-        api_messages.append({"role": msg["role"], "content": msg["content"]})
+    # Prepare messages for API call: system prompt, recent turns and as much
+    # older history as fits in the token budget
+    api_messages, tokens_sent, trimmed_count = build_context(
+        system_prompt,
+        st.session_state.messages,
+        budget=context_budget,
+        keep_turns=keep_turns,
+        summarize=summarize_older
+    )
+    st.session_state.last_request_tokens = tokens_sent
+    tokens_metric.metric("Tokens sent (last request)", tokens_sent)
     
     # Get AI response
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            try:
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=api_messages,
-                    stream=False
-                )
-                ai_response = response.choices[0].message.content
+        try:
+            ai_response = None
+            if stream_responses:
+                placeholder = st.empty()
+                # Clicking Stop reruns the script, which ends this stream;
+                # the partial answer is saved at the top of the next run.
+                st.button("⏹️ Stop", key=f"stop_{len(st.session_state.messages)}")
+                try:
+                    ai_response = stream_completion(model, api_messages, placeholder)
+                except openai.APIStatusError as e:
+                    if e.status_code not in STREAM_UNSUPPORTED_STATUS or st.session_state.partial_response:
+                        raise
+                    # Provider rejected streaming: use the blocking path below
+                    st.session_state.partial_response = None
+                    placeholder.empty()
+            
+            if ai_response is None:
+                with st.spinner("Thinking..."):
+                    ai_response = blocking_completion(model, api_messages)
                 st.markdown(ai_response)
-                
-                # Add assistant response to chat history
-                st.session_state.messages.append({"role": "assistant", "content": ai_response})
-            except Exception as e:
-                error_message = f"Error: {str(e)}"
-                st.error(error_message)
-                st.session_state.messages.append({"role": "assistant", "content": error_message})
-
+            else:
+                placeholder.markdown(ai_response)
+            
+            history_note = ""
+            if trimmed_count:
+                action = "summarised" if summarize_older else "dropped"
+                history_note = f" · {trimmed_count} older messages {action}"
+            st.caption(f"~{tokens_sent} tokens sent{history_note}")
+            
+            # Add assistant response to chat history
+            st.session_state.messages.append({"role": "assistant", "content": ai_response})
+        except Exception as e:
+            st.session_state.partial_response = None
+            error_message = f"Error: {str(e)}"
+            st.error(error_message)
+            st.session_state.messages.append({"role": "assistant", "content": error_message})
@@ -10,17 +10,12 @@ Topics to cover:
 ================================================================================
 """
 
-import os
-import openai
-from dotenv import load_dotenv
+from llm_client import get_client
 
 # Setup
-load_dotenv()
-API_KEY = os.getenv("API_KEY")
-client = openai.OpenAI(
-    api_key=API_KEY,
-    base_url="https://api.poe.com/v1",
-)
+# get_client() reads API_KEY from your .env file and builds one shared client
+# (with connection reuse, timeouts and automatic retries) for the whole program
+client = get_client()
 
 # ============================================================================
 # 1. SIMPLE CHAT
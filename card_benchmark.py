@@ -0,0 +1,95 @@
+"""
+Micro-benchmark for student card rendering.
+
+Times one card the way student_card_app.py used to draw it (load fonts,
+new canvas, header, text and border on every submit) against rendering from
+a cached CardTemplate (copy the pre-drawn background, draw the student's
+details), with and without the PNG encode that follows in the app:
+
+    python card_benchmark.py
+    python card_benchmark.py --cards 2000 --repeat 7
+"""
+
+import argparse
+import io
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from card_renderer import CARD_SIZE, CardTemplate, render_card
+
+STUDENT = {"name": "John Smith", "number": "2024001", "school": "High School", "class": "3A"}
+
+
+def render_card_uncached(student):
+    # The single-card drawing code from before the template cache
+    card_width, card_height = CARD_SIZE
+    card = Image.new('RGB', (card_width, card_height), color='white')
+    draw = ImageDraw.Draw(card)
+
+    title_font = ImageFont.load_default()
+    text_font = ImageFont.load_default()
+    small_font = ImageFont.load_default()
+
+    draw.rectangle([(0, 0), (card_width, 70)], fill='#2563eb')
+    draw.text((20, 25), "STUDENT CARD", fill='white', font=title_font)
+    draw.text((20, 50), student['school'], fill='white', font=small_font)
+
+    photo_size = 90
+    photo_x, photo_y = 20, 90
+    draw.rectangle([(photo_x, photo_y), (photo_x + photo_size, photo_y + photo_size)],
+                   outline='#999', width=2)
+    draw.text((photo_x + 25, photo_y + 35), "Photo", fill='#999', font=small_font)
+
+    draw.text((130, 95), f"Name: {student['name']}", fill='black', font=text_font)
+    draw.text((130, 125), f"Student No.: {student['number']}", fill='black', font=text_font)
+    draw.text((130, 155), f"Class: {student['class']}", fill='black', font=text_font)
+    draw.text((20, 250), f"School: {student['school']}", fill='#666', font=small_font)
+    draw.rectangle([(0, 0), (card_width - 1, card_height - 1)], outline='black', width=2)
+    return card
+
+
+def encode_png(card):
+    buffer = io.BytesIO()
+    card.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def time_per_card(render, cards, repeat):
+    """Best of `repeat` runs, in microseconds per card."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(cards):
+            render()
+        best = min(best, time.perf_counter() - started)
+    return best / cards * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time student card rendering before/after the template cache.")
+    parser.add_argument("--cards", type=int, default=500, help="cards per timed run")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is kept)")
+    args = parser.parse_args(argv)
+
+    template = CardTemplate(school=STUDENT['school'])
+    if render_card(template, STUDENT).tobytes() != render_card_uncached(STUDENT).tobytes():
+        print("warning: cached and uncached cards differ", file=sys.stderr)
+
+    cases = [
+        ("draw, uncached", lambda: render_card_uncached(STUDENT)),
+        ("draw, template", lambda: render_card(template, STUDENT)),
+        ("draw + PNG, uncached", lambda: encode_png(render_card_uncached(STUDENT))),
+        ("draw + PNG, template", lambda: encode_png(render_card(template, STUDENT))),
+    ]
+    results = {name: time_per_card(render, args.cards, args.repeat) for name, render in cases}
+    for name, micros in results.items():
+        print(f"{name:<22} {micros:9.1f} us/card")
+    print(f"\nDrawing speed-up: x{results['draw, uncached'] / results['draw, template']:.2f}")
+    print(f"With PNG encode:  x{results['draw + PNG, uncached'] / results['draw + PNG, template']:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Student card rendering for student_card_app.py, one card or a whole roster.
+
+The parts of a card that never change (white canvas, header band, "STUDENT
+CARD" title, border, and the school name when it is known up front) are drawn
+once into a CardTemplate and every card starts as a copy of it. Batches run
+in a process pool (each worker builds one template per school) and the finished cards are streamed into a zip or a PDF file
+in roster order, so only a few cards are ever in memory at the same time.
+"""
+
+import csv
+import io
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+CARD_SIZE = (450, 280)
+HEADER_HEIGHT = 70
+HEADER_COLOR = '#2563eb'
+PHOTO_SIZE = 90
+PHOTO_POSITION = (20, 90)
+INFO_X, INFO_Y = 130, 95
+
+ROSTER_FIELDS = ("name", "number", "school", "class", "photo")
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+# Cards rendered per worker that may be waiting to be written
+JOBS_PER_WORKER = 4
+
+
+class CardTemplate:
+    def __init__(self, header_color=HEADER_COLOR, school=None):
+        self.header_color = header_color
+        self.school = school
+        self.title_font = ImageFont.load_default()
+        self.text_font = ImageFont.load_default()
+        self.small_font = ImageFont.load_default()
+
+        width, height = CARD_SIZE
+        self.base = Image.new('RGB', CARD_SIZE, color='white')
+        draw = ImageDraw.Draw(self.base)
+        draw.rectangle([(0, 0), (width, HEADER_HEIGHT)], fill=header_color)
+        draw.text((20, 25), "STUDENT CARD", fill='white', font=self.title_font)
+        draw.rectangle([(0, 0), (width - 1, height - 1)], outline='black', width=2)
+        if school is not None:
+            _draw_school(draw, school, self.small_font)
+
+
+def _draw_school(draw, school, font):
+    draw.text((20, 50), school, fill='white', font=font)
+    draw.text((20, 250), f"School: {school}", fill='#666', font=font)
+
+
+def load_photo(data, size=PHOTO_SIZE):
+    """
+    Decode photo bytes into a centered `size` x `size` square.
+
+    JPEGs are decoded at a reduced scale (draft) that still leaves at least
+    twice the final size, the EXIF orientation is applied, and the crop is
+    shrunk with reduce() before the final LANCZOS resize.
+    """
+    photo = Image.open(io.BytesIO(data))
+    photo.draft('RGB', (size * 2, size * 2))
+    photo = ImageOps.exif_transpose(photo)
+    if photo.mode not in ('RGB', 'L'):
+        photo = photo.convert('RGB')
+
+    width, height = photo.size
+    side = min(width, height)
+    left = (width - side) // 2
+    top = (height - side) // 2
+    # reducing_gap makes resize() run reduce() first for large reductions
+    photo = photo.resize((size, size), Image.LANCZOS, box=(left, top, left + side, top + side),
+                         reducing_gap=2.0)
+    return photo.convert('RGB')
+
+
+def render_card(template, student, photo=None):
+    """Draw one card; `photo` is an already fitted PHOTO_SIZE square or None."""
+    card = template.base.copy()
+    draw = ImageDraw.Draw(card)
+    if template.school is None:
+        _draw_school(draw, student['school'], template.small_font)
+
+    photo_x, photo_y = PHOTO_POSITION
+    if photo is not None:
+        card.paste(photo, (photo_x, photo_y))
+    else:
+        draw.rectangle([(photo_x, photo_y), (photo_x + PHOTO_SIZE, photo_y + PHOTO_SIZE)],
+                       outline='#999', width=2)
+        draw.text((photo_x + 25, photo_y + 35), "Photo", fill='#999', font=template.small_font)
+
+    draw.text((INFO_X, INFO_Y), f"Name: {student['name']}", fill='black', font=template.text_font)
+    draw.text((INFO_X, INFO_Y + 30), f"Student No.: {student['number']}", fill='black', font=template.text_font)
+    draw.text((INFO_X, INFO_Y + 60), f"Class: {student['class']}", fill='black', font=template.text_font)
+    return card
+
+
+def iter_roster(f, default_school=""):
+    """
+    Yield (line number, student, error) for every row of a roster CSV.
+
+    Headers such as "Student Name", "Student No." or "Class/Form" are
+    accepted; a row without a school uses `default_school`.
+    """
+    reader = csv.DictReader(f)
+    aliases = {"studentname": "name", "studentnumber": "number", "studentno": "number",
+               "no": "number", "id": "number", "studentid": "number", "schoolname": "school",
+               "classform": "class", "form": "class", "photofile": "photo", "image": "photo"}
+    fieldnames = []
+    for name in reader.fieldnames or []:
+        key = re.sub(r"[^a-z]", "", (name or "").lower())
+        fieldnames.append(aliases.get(key, key if key in ROSTER_FIELDS else name))
+    reader.fieldnames = fieldnames
+
+    for record in reader:
+        student = {field: (record.get(field) or "").strip() for field in ROSTER_FIELDS}
+        student['school'] = student['school'] or default_school
+        missing = [field for field in ("name", "number", "school", "class") if not student[field]]
+        if missing:
+            yield reader.line_num, None, f"missing {', '.join(missing)}"
+        else:
+            yield reader.line_num, student, None
+
+
+class PhotoSource:
+    """Student photos from a folder or a zip, looked up by file name without extension."""
+
+    def __init__(self, folder=None, zip_file=None):
+        self.folder = folder
+        self.zip = zipfile.ZipFile(zip_file) if zip_file is not None else None
+        self._names = {}
+        if self.zip is not None:
+            names = (info.filename for info in self.zip.infolist() if not info.is_dir())
+        elif folder:
+            names = (entry.name for entry in os.scandir(folder) if entry.is_file())
+        else:
+            names = ()
+        for name in names:
+            stem, extension = os.path.splitext(os.path.basename(name))
+            if extension.lower() in PHOTO_EXTENSIONS and not stem.startswith('.'):
+                self._names.setdefault(stem.lower(), name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def get(self, student):
+        """Photo bytes for the roster's "photo" column or the student number, or None."""
+        for key in (student.get('photo'), student['number']):
+            name = self._names.get(os.path.splitext(os.path.basename(key or ""))[0].lower())
+            if name is None:
+                continue
+            if self.zip is not None:
+                return self.zip.read(name)
+            with open(os.path.join(self.folder, name), 'rb') as f:
+                return f.read()
+        return None
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+
+
+# Process pool workers ----------------------------------------------------
+
+_worker_header_color = HEADER_COLOR
+_worker_templates = {}  # school -> CardTemplate
+
+
+def _init_worker(header_color):
+    global _worker_header_color
+    _worker_header_color = header_color
+    _worker_templates.clear()
+
+
+def _render_job(student, photo_bytes, image_format):
+    photo = None
+    if photo_bytes:
+        try:
+            photo = load_photo(photo_bytes)
+        except (OSError, ValueError):
+            photo = None  # Unreadable photos get the placeholder
+    template = _worker_templates.get(student['school'])
+    if template is None:
+        template = _worker_templates[student['school']] = CardTemplate(_worker_header_color, student['school'])
+    card = render_card(template, student, photo)
+    buffer = io.BytesIO()
+    card.save(buffer, format=image_format, quality=90)
+    return buffer.getvalue()
+
+
+def iter_rendered_cards(students, photos, image_format='PNG', workers=None, header_color=HEADER_COLOR):
+    """
+    Render cards in a process pool and yield (student, encoded image) in order.
+
+    Only a few jobs per worker are queued at a time, so photos are read
+    and finished cards are held just ahead of whoever writes them out.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(header_color,)) as pool:
+        pending = deque()
+        for student in students:
+            photo_bytes = photos.get(student) if photos is not None else None
+            pending.append((student, pool.submit(_render_job, student, photo_bytes, image_format)))
+            if len(pending) >= workers * JOBS_PER_WORKER:
+                student, future = pending.popleft()
+                yield student, future.result()
+        while pending:
+            student, future = pending.popleft()
+            yield student, future.result()
+
+
+def write_cards_zip(cards, path):
+    """Write (student, PNG bytes) pairs into a zip as <number>_student_card.png."""
+    count = 0
+    used = set()
+    # PNGs are already compressed, so store them as they are
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for student, data in cards:
+            name = f"{student['number']}_student_card.png"
+            if name in used:
+                name = f"{student['number']}_{count + 1}_student_card.png"
+            used.add(name)
+            archive.writestr(name, data)
+            count += 1
+    return count
+
+
+def write_cards_pdf(cards, path, resolution=150):
+    """
+    Write (student, JPEG bytes) pairs as a PDF with one card per page.
+
+    The PDF is written by hand as the cards arrive: each JPEG is embedded
+    as it is (DCTDecode), so pages are never decoded or re-encoded and
+    nothing has to be re-read when more pages are added.
+    """
+    width, height = (size * 72 / resolution for size in CARD_SIZE)
+    offsets = {}
+    page_ids = []
+
+    with open(path, 'wb') as f:
+        def start_object(number):
+            offsets[number] = f.tell()
+            f.write(f"{number} 0 obj\n".encode())
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        # Objects 1 and 2 (catalog and page tree) are written at the end
+        next_id = 3
+        for _, data in cards:
+            image_id, content_id, page_id = next_id, next_id + 1, next_id + 2
+            next_id += 3
+
+            start_object(image_id)
+            f.write(f"<< /Type /XObject /Subtype /Image /Width {CARD_SIZE[0]} /Height {CARD_SIZE[1]}"
+                    f" /ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode"
+                    f" /Length {len(data)} >>\nstream\n".encode())
+            f.write(data)
+            f.write(b"\nendstream\nendobj\n")
+
+            content = f"q {width:.2f} 0 0 {height:.2f} 0 0 cm /Card Do Q".encode()
+            start_object(content_id)
+            f.write(f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream\nendobj\n")
+
+            start_object(page_id)
+            f.write(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:.2f} {height:.2f}]"
+                    f" /Resources << /XObject << /Card {image_id} 0 R >> >>"
+                    f" /Contents {content_id} 0 R >>\nendobj\n".encode())
+            page_ids.append(page_id)
+
+        start_object(2)
+        kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+        f.write(f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>\nendobj\n".encode())
+        start_object(1)
+        f.write(b"<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+
+        xref_offset = f.tell()
+        f.write(f"xref\n0 {next_id}\n0000000000 65535 f \n".encode())
+        for number in range(1, next_id):
+            f.write(f"{offsets[number]:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {next_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+    return len(page_ids)
@@ -0,0 +1,104 @@
+"""
+Conversation history budgeting for the chat apps.
+
+Every turn we send the system prompt plus the chat history to the model.
+This module keeps that request inside a token budget: the system prompt and
+the most recent turns are always sent word for word, and older turns are
+either squeezed into a short summary or dropped.
+"""
+
+import re
+
+# Rough context budgets (in tokens) we allow per request for each model.
+# These are kept well below the real context windows to save cost and time.
+MODEL_CONTEXT_BUDGETS = {
+    "gemini-2.5-pro": 32000,
+    "gpt-4": 6000,
+    "claude-3-opus": 32000,
+    "llama-3.1-405b": 16000,
+}
+DEFAULT_CONTEXT_BUDGET = 8000
+
+# Extra tokens each message costs for its role and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# CJK characters are roughly one token each; other text is about 4 chars/token
+_CJK_PATTERN = re.compile(r"[　-ヿ㐀-鿿가-힯＀-￯]")
+
+
+def estimate_tokens(text):
+    if not text:
+        return 0
+    cjk_chars = len(_CJK_PATTERN.findall(text))
+    other_chars = len(text) - cjk_chars
+    return cjk_chars + (other_chars + 3) // 4
+
+
+def message_tokens(message):
+    """Token estimate for one chat message, cached on the message dict."""
+    if message.get("tokens") is None:
+        message["tokens"] = estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+    return message["tokens"]
+
+
+def summarize_turns(messages, max_tokens):
+    """Build a short summary note of older messages without calling the model."""
+    lines = []
+    used = estimate_tokens("Summary of the earlier conversation:") + MESSAGE_OVERHEAD_TOKENS
+    for msg in messages:
+        # Keep the first sentence (or first 160 chars) of each message
+        text = " ".join(msg["content"].split())
+        first_sentence = re.split(r"(?<=[.!?。！？])\s*", text, maxsplit=1)[0]
+        line = f"- {msg['role']}: {first_sentence[:160]}"
+        line_tokens = estimate_tokens(line) + 1
+        if used + line_tokens > max_tokens:
+            break
+        lines.append(line)
+        used += line_tokens
+    if not lines:
+        return None
+    return "Summary of the earlier conversation:\n" + "\n".join(lines)
+
+
+def build_context(system_prompt, messages, budget, keep_turns=4, summarize=True):
+    """
+    Pick the messages to send for the next request.
+
+    Returns (api_messages, tokens_sent, older_messages_trimmed).
+    One turn is a user message plus the assistant reply, so the last
+    `keep_turns * 2` messages are always sent as they are.
+    """
+    system_messages = []
+    if system_prompt and system_prompt.strip():
+        system_messages.append({"role": "system", "content": system_prompt.strip()})
+    used = sum(message_tokens(m) for m in system_messages)
+
+    keep_count = max(1, keep_turns * 2)
+    recent = messages[-keep_count:]
+    older = messages[:-keep_count]
+    used += sum(message_tokens(m) for m in recent)
+
+    # Fill the rest of the budget with older messages, newest first
+    kept_older = []
+    for msg in reversed(older):
+        cost = message_tokens(msg)
+        if used + cost > budget:
+            break
+        kept_older.append(msg)
+        used += cost
+    kept_older.reverse()
+    trimmed = older[:len(older) - len(kept_older)]
+
+    summary_messages = []
+    if trimmed and summarize and budget > used:
+        summary = summarize_turns(trimmed, budget - used)
+        if summary:
+            summary_message = {"role": "system", "content": summary}
+            summary_messages.append(summary_message)
+            used += message_tokens(summary_message)
+
+    api_messages = [
+        {"role": m["role"], "content": m["content"]}
+        for m in system_messages + summary_messages + kept_older + recent
+    ]
+    return api_messages, used, len(trimmed)
@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 from datetime import datetime, timedelta
 import json
 import random
@@ -7,6 +7,30 @@ from collections import defaultdict
 import numpy as np
 from PIL import Image, ImageTk
 import threading
+import queue
+import itertools
+import os
+from planner_core import (ScheduleCancelled, compute_stats, format_schedule_lines,
+                          format_stats, schedule_assignments)
+from planner_optimizer import TIME_SLOTS, optimize_schedule
+from planner_store import PlannerStore
+from planner_io import export_sessions, import_assignments
+
+# SQLite file where courses, tasks and the last schedule are saved
+DB_PATH = os.getenv("STUDY_PLANNER_DB",
+                    os.path.join(os.path.dirname(os.path.abspath(__file__)), "study_planner.db"))
+# Saved tasks are loaded this many at a time after the window opens
+ASSIGNMENT_LOAD_PAGE = 500
+# Changes are written to the database in one batch this long after the last edit
+STORE_FLUSH_MS = 1000
+
+# Rows shown per page in the task list
+TASKS_PAGE_SIZE = 200
+
+# Delay before "Generate New Schedule" starts, so quick repeated clicks run once
+SCHEDULE_DEBOUNCE_MS = 300
+# How often the main loop checks for results from the schedule worker
+SCHEDULE_POLL_MS = 50
 
 class AIStudyPlanner:
     def __init__(self, root):
@@ -26,14 +50,41 @@ class AIStudyPlanner:
             'preferred_times': ['Morning', 'Afternoon', 'Evening']
         }
         
-        # Load sample data
-        self.load_sample_data()
+        # Background schedule generation state
+        self.schedule_queue = queue.Queue()
+        self.schedule_run_id = 0
+        self.schedule_cancel = None
+        self.schedule_after_id = None
+        self.poll_after_id = None
+        
+        # Stable ids for assignments (id -> assignment)
+        self.assignment_ids = itertools.count(1)
+        self.assignment_index = {}
+        self.tasks_page = 0
+        
+        # Saved data (writes are queued and flushed in batches)
+        self.store = PlannerStore(DB_PATH)
+        self.flush_after_id = None
+        self.assignment_pages = None
+        
+        # Load saved data, or sample data on the first run
+        if self.store.is_empty():
+            self.load_sample_data()
+            self.store.save_courses(self.courses)
+            self.store.save_assignments(self.assignments)
+            self.store.flush()
+        else:
+            self.load_saved_data()
         
         # Setup GUI
         self.setup_gui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
-        # Initialize with default schedule
-        self.generate_schedule()
+        # Initialize with default schedule (once every saved task is loaded)
+        if self.assignment_pages is None:
+            self.generate_schedule()
+        else:
+            self.root.after(1, self.load_next_assignment_page)
     
     def setup_gui(self):
         # Style configuration
@@ -115,6 +166,11 @@ class AIStudyPlanner:
         # Add button
         add_button = ttk.Button(input_frame, text="Add Task", command=self.add_task, width=20)
         add_button.grid(row=5, column=0, columnspan=2, pady=10)
+        
+        # Bulk import button
+        import_button = ttk.Button(input_frame, text="Import Tasks (CSV/ICS)",
+                                   command=self.import_tasks, width=20)
+        import_button.grid(row=6, column=0, columnspan=2, pady=(0, 10))
     
     def create_courses_section(self, parent):
         courses_frame = ttk.LabelFrame(parent, text="Current Courses & Tasks", style='Card.TFrame')
@@ -135,12 +191,27 @@ class AIStudyPlanner:
         scrollbar.pack(side='right', fill='y')
         self.tasks_tree.configure(yscrollcommand=scrollbar.set)
         
+        # Double-click a task to copy it into the input fields for editing
+        self.tasks_tree.bind('<Double-1>', self.load_selected_task)
+        
+        # Page controls (only one page of tasks is kept in the tree)
+        page_frame = tk.Frame(courses_frame, bg='white')
+        page_frame.pack(fill='x', padx=5)
+        ttk.Button(page_frame, text="◀", width=3, command=lambda: self.change_page(-1)).pack(side='left')
+        self.page_label = tk.Label(page_frame, text="", bg='white')
+        self.page_label.pack(side='left', expand=True)
+        ttk.Button(page_frame, text="▶", width=3, command=lambda: self.change_page(1)).pack(side='right')
+        
         # Populate with existing tasks
         self.update_tasks_tree()
         
-        # Delete button
-        delete_button = ttk.Button(courses_frame, text="Delete Selected", command=self.delete_task)
-        delete_button.pack(pady=5)
+        # Update and delete buttons
+        buttons_frame = tk.Frame(courses_frame, bg='white')
+        buttons_frame.pack(pady=5)
+        update_button = ttk.Button(buttons_frame, text="Update Selected", command=self.update_selected_task)
+        update_button.pack(side='left', padx=5)
+        delete_button = ttk.Button(buttons_frame, text="Delete Selected", command=self.delete_task)
+        delete_button.pack(side='left', padx=5)
     
     def create_preferences_section(self, parent):
         pref_frame = ttk.LabelFrame(parent, text="Study Preferences", style='Card.TFrame')
@@ -167,15 +238,33 @@ class AIStudyPlanner:
                                            textvariable=self.break_minutes_var, width=15)
         break_minutes_spinbox.grid(row=2, column=1, padx=5, pady=5)
         
+        # Preferred times of day (used by the optimiser)
+        tk.Label(pref_frame, text="Preferred Times:", bg='white').grid(row=3, column=0, padx=5, pady=5, sticky='nw')
+        times_frame = tk.Frame(pref_frame, bg='white')
+        times_frame.grid(row=3, column=1, padx=5, pady=5, sticky='w')
+        self.preferred_time_vars = {}
+        for slot in TIME_SLOTS:
+            var = tk.BooleanVar(value=slot in self.user_preferences['preferred_times'])
+            tk.Checkbutton(times_frame, text=slot, variable=var, bg='white').pack(anchor='w')
+            self.preferred_time_vars[slot] = var
+        
+        # Optimiser mode: weigh course difficulty and preferred times
+        self.optimizer_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(pref_frame, text="Optimiser mode (difficulty & time of day)",
+                       variable=self.optimizer_var, bg='white').grid(row=4, column=0, columnspan=2,
+                                                                    padx=5, sticky='w')
+        
         # Update preferences button
         update_button = ttk.Button(pref_frame, text="Update Preferences", 
                                   command=self.update_preferences, width=20)
-        update_button.grid(row=3, column=0, columnspan=2, pady=10)
-        
-        # Generate schedule button
-        generate_button = ttk.Button(pref_frame, text="Generate New Schedule", 
-                                    command=self.generate_schedule, width=20)
-        generate_button.grid(row=4, column=0, columnspan=2, pady=(0, 10))
+        update_button.grid(row=5, column=0, columnspan=2, pady=10)
+        
+        # Generate schedule button (disabled until every saved task is loaded)
+        self.generate_button = ttk.Button(pref_frame, text="Generate New Schedule", 
+                                         command=self.request_schedule, width=20)
+        self.generate_button.grid(row=6, column=0, columnspan=2, pady=(0, 10))
+        if self.assignment_pages is not None:
+            self.generate_button.config(state='disabled')
     
     def create_schedule_section(self, parent):
         schedule_frame = ttk.LabelFrame(parent, text="Study Schedule", style='Card.TFrame')
@@ -191,6 +280,18 @@ class AIStudyPlanner:
         export_button = ttk.Button(schedule_frame, text="Export Schedule", 
                                   command=self.export_schedule)
         export_button.pack(side='right', padx=10, pady=(0, 10))
+        
+        # Export sessions as a calendar or spreadsheet
+        export_sessions_button = ttk.Button(schedule_frame, text="Export Sessions (ICS/CSV)",
+                                            command=self.export_study_sessions)
+        export_sessions_button.pack(side='right', padx=(10, 0), pady=(0, 10))
+        
+        # Progress of the schedule being generated
+        self.schedule_progress = ttk.Progressbar(schedule_frame, mode='determinate',
+                                                 maximum=100, length=200)
+        self.schedule_progress.pack(side='left', padx=10, pady=(0, 10))
+        self.schedule_status = tk.Label(schedule_frame, text="", bg='white')
+        self.schedule_status.pack(side='left', pady=(0, 10))
     
     def create_stats_section(self, parent):
         stats_frame = ttk.LabelFrame(parent, text="Study Statistics", style='Card.TFrame')
@@ -229,8 +330,68 @@ class AIStudyPlanner:
              "due_date": (today + timedelta(days=10)).strftime('%Y-%m-%d'), 
              "priority": "Low", "hours": 2}
         ]
+        self.index_assignments()
     
-    def add_task(self):
+    def load_saved_data(self):
+        self.courses = self.store.load_courses()
+        self.study_sessions = self.store.load_sessions()
+        max_id = self.store.max_assignment_id()
+        self.assignment_ids = itertools.count(max_id + 1)
+        
+        # Only the first page of tasks now; the rest load once the window is up.
+        # Tasks added meanwhile get ids above max_id, so paging stops before them.
+        self.assignment_pages = self.store.iter_assignment_pages(ASSIGNMENT_LOAD_PAGE, max_id)
+        self.assignments = next(self.assignment_pages, [])
+        self.index_assignments()
+    
+    def load_next_assignment_page(self):
+        page = next(self.assignment_pages, None)
+        if page is None:
+            self.assignment_pages = None
+            self.generate_button.config(state='normal')
+            self.generate_schedule()
+            return
+        
+        was_page_full = len(self.tasks_tree.get_children()) >= TASKS_PAGE_SIZE
+        self.assignments.extend(page)
+        for assignment in page:
+            self.assignment_index[assignment['id']] = assignment
+        if was_page_full:
+            self.update_page_label()
+        else:
+            self.update_tasks_tree()
+        self.root.after(1, self.load_next_assignment_page)
+    
+    def schedule_flush(self):
+        # Batch writes: flush once things have been quiet for a moment
+        if self.flush_after_id is not None:
+            self.root.after_cancel(self.flush_after_id)
+        self.flush_after_id = self.root.after(STORE_FLUSH_MS, self.flush_store)
+    
+    def flush_store(self):
+        self.flush_after_id = None
+        try:
+            self.store.flush()
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save changes: {str(e)}")
+    
+    def on_close(self):
+        if self.schedule_cancel is not None:
+            self.schedule_cancel.set()
+        try:
+            self.store.close()
+        finally:
+            self.root.destroy()
+    
+    def index_assignments(self):
+        # Give every assignment a stable id (used as its Treeview row id)
+        self.assignment_index = {}
+        for assignment in self.assignments:
+            if 'id' not in assignment:
+                assignment['id'] = next(self.assignment_ids)
+            self.assignment_index[assignment['id']] = assignment
+    
+    def read_task_inputs(self):
         course = self.course_var.get().strip()
         task = self.task_var.get().strip()
         due_date = self.due_date_var.get().strip()
@@ -239,7 +400,13 @@ class AIStudyPlanner:
         
         if not course or not task or not due_date:
             messagebox.showwarning("Input Error", "Please fill in all fields.")
-            return
+            return None
+        
+        try:
+            datetime.strptime(due_date, '%Y-%m-%d')
+        except ValueError:
+            messagebox.showwarning("Input Error", "Please enter the due date as YYYY-MM-DD.")
+            return None
         
         try:
             hours = float(hours)
@@ -247,22 +414,98 @@ class AIStudyPlanner:
                 raise ValueError
         except ValueError:
             messagebox.showwarning("Input Error", "Please enter a valid number of hours.")
-            return
+            return None
         
-        # Add to assignments list
-        self.assignments.append({
+        return {
             "course": course,
             "task": task,
             "due_date": due_date,
             "priority": priority,
             "hours": hours
-        })
+        }
+    
+    def add_task(self):
+        assignment = self.read_task_inputs()
+        if assignment is None:
+            return
         
-        # Update UI
-        self.update_tasks_tree()
+        # Add to assignments list
+        assignment['id'] = next(self.assignment_ids)
+        self.assignments.append(assignment)
+        self.assignment_index[assignment['id']] = assignment
+        self.store.save_assignment(assignment)
+        self.schedule_flush()
+        
+        # Update UI (only the new row, and only if it is on the visible page)
+        position = len(self.assignments) - 1
+        start, end = self.page_bounds()
+        if start <= position < end:
+            self.tasks_tree.insert('', 'end', iid=str(assignment['id']),
+                                   values=self.task_row_values(assignment))
+        self.update_page_label()
         self.clear_input_fields()
         messagebox.showinfo("Success", "Task added successfully!")
     
+    def import_tasks(self):
+        filename = filedialog.askopenfilename(
+            title="Import Tasks",
+            filetypes=[("Task files", "*.csv *.ics"), ("CSV", "*.csv"), ("iCalendar", "*.ics"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        
+        try:
+            imported, errors = import_assignments(filename)
+        except Exception as e:
+            messagebox.showerror("Import Error", f"Failed to import tasks: {str(e)}")
+            return
+        
+        # Add everything at once, then refresh the UI and save a single time
+        for assignment in imported:
+            assignment['id'] = next(self.assignment_ids)
+            self.assignment_index[assignment['id']] = assignment
+        self.assignments.extend(imported)
+        self.store.save_assignments(imported)
+        self.schedule_flush()
+        self.update_tasks_tree()
+        
+        summary = f"Imported {len(imported)} tasks."
+        if errors:
+            summary += f"\n\nSkipped {len(errors)} invalid rows:\n"
+            summary += "\n".join(f"• line {line}: {error}" for line, error in errors[:10])
+            if len(errors) > 10:
+                summary += f"\n• ... and {len(errors) - 10} more"
+        messagebox.showinfo("Import Complete", summary)
+    
+    def update_selected_task(self):
+        selected = self.tasks_tree.selection()
+        if len(selected) != 1:
+            messagebox.showwarning("Selection Error", "Please select one task to update.")
+            return
+        
+        changes = self.read_task_inputs()
+        if changes is None:
+            return
+        
+        assignment = self.assignment_index[int(selected[0])]
+        assignment.update(changes)
+        self.store.save_assignment(assignment)
+        self.schedule_flush()
+        self.tasks_tree.item(selected[0], values=self.task_row_values(assignment))
+        self.clear_input_fields()
+    
+    def load_selected_task(self, event=None):
+        # Copy the selected task into the input fields so it can be edited
+        selected = self.tasks_tree.selection()
+        if len(selected) != 1:
+            return
+        assignment = self.assignment_index[int(selected[0])]
+        self.course_var.set(assignment['course'])
+        self.task_var.set(assignment['task'])
+        self.due_date_var.set(assignment['due_date'])
+        self.priority_var.set(assignment['priority'])
+        self.hours_var.set(str(assignment['hours']))
+    
     def clear_input_fields(self):
         self.course_var.set("")
         self.task_var.set("")
@@ -270,20 +513,44 @@ class AIStudyPlanner:
         self.priority_var.set("Medium")
         self.hours_var.set("2")
     
+    @staticmethod
+    def task_row_values(assignment):
+        return (
+            assignment['course'],
+            assignment['task'],
+            assignment['due_date'],
+            assignment['priority'],
+            assignment['hours']
+        )
+    
+    def page_count(self):
+        return max(1, -(-len(self.assignments) // TASKS_PAGE_SIZE))
+    
+    def page_bounds(self):
+        start = self.tasks_page * TASKS_PAGE_SIZE
+        return start, start + TASKS_PAGE_SIZE
+    
+    def update_page_label(self):
+        self.page_label.config(
+            text=f"Page {self.tasks_page + 1}/{self.page_count()} ({len(self.assignments)} tasks)"
+        )
+    
+    def change_page(self, step):
+        page = min(max(self.tasks_page + step, 0), self.page_count() - 1)
+        if page != self.tasks_page:
+            self.tasks_page = page
+            self.update_tasks_tree()
+    
     def update_tasks_tree(self):
-        # Clear existing items
-        for item in self.tasks_tree.get_children():
-            self.tasks_tree.delete(item)
-        
-        # Add assignments to treeview
-        for i, assignment in enumerate(self.assignments):
-            self.tasks_tree.insert('', 'end', iid=i, values=(
-                assignment['course'],
-                assignment['task'],
-                assignment['due_date'],
-                assignment['priority'],
-                assignment['hours']
-            ))
+        # Full redraw of the visible page only (at most TASKS_PAGE_SIZE rows)
+        self.tasks_page = min(self.tasks_page, self.page_count() - 1)
+        self.tasks_tree.delete(*self.tasks_tree.get_children())
+        
+        start, end = self.page_bounds()
+        for assignment in self.assignments[start:end]:
+            self.tasks_tree.insert('', 'end', iid=str(assignment['id']),
+                                   values=self.task_row_values(assignment))
+        self.update_page_label()
     
     def delete_task(self):
         selected = self.tasks_tree.selection()
@@ -291,139 +558,169 @@ class AIStudyPlanner:
             messagebox.showwarning("Selection Error", "Please select a task to delete.")
             return
         
-        # Get index of selected item
-        index = int(selected[0])
-        
         # Remove from assignments list
-        if 0 <= index < len(self.assignments):
-            del self.assignments[index]
-        
-        # Update UI
-        self.update_tasks_tree()
+        deleted_ids = {int(iid) for iid in selected}
+        self.assignments = [a for a in self.assignments if a['id'] not in deleted_ids]
+        for assignment_id in deleted_ids:
+            self.assignment_index.pop(assignment_id, None)
+        self.store.delete_assignments(deleted_ids)
+        self.schedule_flush()
+        
+        # Update UI: remove the deleted rows, then pull rows up from the
+        # next page to refill this one
+        self.tasks_tree.delete(*selected)
+        start, end = self.page_bounds()
+        if start >= len(self.assignments) and self.tasks_page > 0:
+            self.tasks_page -= 1
+            self.update_tasks_tree()
+            return
+        shown = len(self.tasks_tree.get_children())
+        for assignment in self.assignments[start + shown:end]:
+            self.tasks_tree.insert('', 'end', iid=str(assignment['id']),
+                                   values=self.task_row_values(assignment))
+        self.update_page_label()
     
     def update_preferences(self):
         try:
             self.user_preferences['daily_study_hours'] = float(self.study_hours_var.get())
             self.user_preferences['focus_hours'] = float(self.focus_hours_var.get())
             self.user_preferences['break_minutes'] = int(self.break_minutes_var.get())
+            self.user_preferences['preferred_times'] = [
+                slot for slot, var in self.preferred_time_vars.items() if var.get()
+            ]
             messagebox.showinfo("Success", "Preferences updated successfully!")
         except ValueError:
             messagebox.showwarning("Input Error", "Please enter valid numbers.")
     
+    def request_schedule(self):
+        # Debounce: repeated clicks within a short time start only one run
+        if self.schedule_after_id is not None:
+            self.root.after_cancel(self.schedule_after_id)
+        self.schedule_after_id = self.root.after(SCHEDULE_DEBOUNCE_MS, self.generate_schedule)
+    
     def generate_schedule(self):
+        self.schedule_after_id = None
+        
+        # Cancel any run that is still in progress, and its polling loop
+        if self.schedule_cancel is not None:
+            self.schedule_cancel.set()
+            self.schedule_cancel = None
+        if self.poll_after_id is not None:
+            self.root.after_cancel(self.poll_after_id)
+            self.poll_after_id = None
+        
         # Clear previous schedule
         self.study_sessions = []
         
         if not self.assignments:
             self.schedule_text.delete(1.0, tk.END)
             self.schedule_text.insert(tk.END, "No tasks to schedule. Add tasks first.")
+            self.schedule_progress['value'] = 0
+            self.schedule_status.config(text="")
             return
         
-        # Sort assignments by priority and due date
-        priority_values = {"High": 3, "Medium": 2, "Low": 1}
-        sorted_assignments = sorted(self.assignments, 
-                                   key=lambda x: (priority_values[x['priority']], 
-                                                 datetime.strptime(x['due_date'], '%Y-%m-%d')))
-        
-        # Generate schedule using AI-like algorithm
-        today = datetime.now()
-        current_date = today
-        daily_hours_remaining = self.user_preferences['daily_study_hours']
-        session_count = 0
-        
-        self.schedule_text.delete(1.0, tk.END)
-        schedule_output = "AI-GENERATED STUDY SCHEDULE\n"
-        schedule_output += "=" * 50 + "\n\n"
+        # Plan sessions on a worker thread so the window stays responsive
+        self.schedule_run_id += 1
+        cancel_event = threading.Event()
+        self.schedule_cancel = cancel_event
+        worker = threading.Thread(
+            target=self.schedule_worker,
+            args=(self.schedule_run_id, list(self.assignments), dict(self.user_preferences),
+                  list(self.courses), self.optimizer_var.get(), cancel_event),
+            daemon=True
+        )
+        self.schedule_progress['value'] = 0
+        self.schedule_status.config(text="Generating schedule...")
+        worker.start()
+        self.poll_after_id = self.root.after(SCHEDULE_POLL_MS, self.poll_schedule_queue)
+    
+    def schedule_worker(self, run_id, assignments, preferences, courses, use_optimizer, cancel_event):
+        # Runs off the Tk main loop: never touch widgets here, only post messages
+        def report(done, total):
+            self.schedule_queue.put(('progress', run_id, done, total))
         
-        for assignment in sorted_assignments:
-            due_date = datetime.strptime(assignment['due_date'], '%Y-%m-%d')
-            days_until_due = (due_date - today).days
-            
-            if days_until_due < 0:
-                schedule_output += f"⚠️ OVERDUE: {assignment['task']} (was due {assignment['due_date']})\n"
-                continue
-            
-            # Calculate hours per day needed
-            hours_needed = assignment['hours']
-            days_available = max(1, days_until_due)
-            hours_per_day = min(hours_needed / days_available, 
-                              self.user_preferences['daily_study_hours'] / 2)
-            
-            schedule_output += f"\n📚 {assignment['course']}: {assignment['task']}\n"
-            schedule_output += f"   Due: {assignment['due_date']} | Priority: {assignment['priority']}\n"
-            schedule_output += f"   Recommended: {hours_per_day:.1f} hours per day\n"
-            
-            # Generate sessions for this assignment
-            hours_allocated = 0
-            current_date = today
+        try:
+            if use_optimizer:
+                plan = optimize_schedule(assignments, preferences, courses,
+                                         progress=report, cancel_event=cancel_event)
+            else:
+                plan = schedule_assignments(assignments, preferences,
+                                            progress=report, cancel_event=cancel_event)
+            schedule_output = "".join(format_schedule_lines(plan))
+            self.schedule_queue.put(('done', run_id, plan, schedule_output))
+        except ScheduleCancelled:
+            pass
+        except Exception as e:
+            self.schedule_queue.put(('error', run_id, str(e)))
+    
+    def poll_schedule_queue(self):
+        self.poll_after_id = None
+        finished = False
+        while True:
+            try:
+                message = self.schedule_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind, run_id = message[0], message[1]
+            if run_id != self.schedule_run_id:
+                continue  # Result of a cancelled run
             
-            while hours_allocated < hours_needed and current_date <= due_date:
-                if current_date.weekday() >= 5:  # Skip weekends
-                    current_date += timedelta(days=1)
-                    continue
-                
-                # Calculate session hours for this day
-                session_hours = min(hours_per_day, hours_needed - hours_allocated, 
-                                  self.user_preferences['focus_hours'])
+            if kind == 'progress':
+                done, total = message[2], message[3]
+                self.schedule_progress['value'] = 100 * done / max(total, 1)
+                self.schedule_status.config(text=f"Planning {done}/{total} tasks...")
+            elif kind == 'done':
+                plan, schedule_output = message[2], message[3]
+                self.study_sessions = plan['sessions']
+                self.store.replace_sessions(self.study_sessions)
+                self.schedule_flush()
                 
-                if session_hours > 0:
-                    # Create session
-                    session = {
-                        'date': current_date.strftime('%Y-%m-%d'),
-                        'course': assignment['course'],
-                        'task': assignment['task'],
-                        'hours': session_hours,
-                        'priority': assignment['priority']
-                    }
-                    self.study_sessions.append(session)
-                    
-                    schedule_output += f"   • {current_date.strftime('%A, %b %d')}: "
-                    schedule_output += f"{session_hours:.1f} hours\n"
-                    
-                    hours_allocated += session_hours
-                    session_count += 1
+                # Display schedule
+                self.schedule_text.delete(1.0, tk.END)
+                self.schedule_text.insert(tk.END, schedule_output)
+                self.schedule_progress['value'] = 100
+                status = f"{len(self.study_sessions)} sessions planned"
+                if plan.get('note'):
+                    status += f" (greedy: {plan['note']})"
+                self.schedule_status.config(text=status)
                 
-                current_date += timedelta(days=1)
-        
-        # Add study tips
-        schedule_output += "\n" + "=" * 50 + "\n"
-        schedule_output += "📝 AI STUDY TIPS:\n"
-        tips = [
-            "Use the Pomodoro technique: 25 min focus, 5 min break",
-            "Review material within 24 hours to improve retention by up to 60%",
-            "Study hardest subjects when you're most alert",
-            "Teach what you've learned to reinforce understanding",
-            "Take regular breaks to maintain focus and prevent burnout"
-        ]
-        
-        for tip in tips:
-            schedule_output += f"• {tip}\n"
-        
-        # Display schedule
-        self.schedule_text.insert(tk.END, schedule_output)
-        
-        # Update statistics
-        self.update_stats()
+                # Update statistics
+                self.update_stats()
+                finished = True
+            elif kind == 'error':
+                self.schedule_status.config(text="Schedule failed")
+                messagebox.showerror("Schedule Error", f"Failed to generate schedule: {message[2]}")
+                finished = True
+        
+        if finished:
+            self.schedule_cancel = None
+        elif self.schedule_cancel is not None:
+            self.poll_after_id = self.root.after(SCHEDULE_POLL_MS, self.poll_schedule_queue)
     
     def update_stats(self):
-        total_hours = sum(assignment['hours'] for assignment in self.assignments)
-        high_priority = sum(1 for a in self.assignments if a['priority'] == 'High')
-        medium_priority = sum(1 for a in self.assignments if a['priority'] == 'Medium')
-        low_priority = sum(1 for a in self.assignments if a['priority'] == 'Low')
-        
-        stats_text = f"""
-        Study Statistics:
-        • Total tasks: {len(self.assignments)}
-        • Total study hours needed: {total_hours}
-        • High priority tasks: {high_priority}
-        • Medium priority tasks: {medium_priority}
-        • Low priority tasks: {low_priority}
-        • Recommended daily study: {self.user_preferences['daily_study_hours']} hours
-        """
+        stats_text = format_stats(compute_stats(self.assignments, self.user_preferences))
         
         self.stats_text.delete(1.0, tk.END)
         self.stats_text.insert(tk.END, stats_text)
     
+    def export_study_sessions(self):
+        if not self.study_sessions:
+            messagebox.showwarning("Export Error", "Generate a schedule first.")
+            return
+        filename = filedialog.asksaveasfilename(
+            title="Export Sessions",
+            defaultextension=".ics",
+            initialfile=f"study_sessions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ics",
+            filetypes=[("iCalendar", "*.ics"), ("CSV", "*.csv")]
+        )
+        if not filename:
+            return
+        try:
+            export_sessions(self.study_sessions, filename)
+            messagebox.showinfo("Export Successful", f"{len(self.study_sessions)} sessions exported to {filename}")
+        except Exception as e:
+            messagebox.showerror("Export Error", f"Failed to export sessions: {str(e)}")
+    
     def export_schedule(self):
         try:
             filename = f"study_schedule_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
@@ -1,18 +1,7 @@
-import os
 import streamlit as st
-import openai
-from dotenv import load_dotenv
+from fact_pool import get_fact_pool
 from datetime import datetime
 
-load_dotenv()
-API_KEY = os.getenv("API_KEY")
-
-# Initialize OpenAI client
-client = openai.OpenAI(
-    api_key=API_KEY,
-    base_url="https://api.poe.com/v1",
-)
-
 # Page configuration
 st.set_page_config(
     page_title="AI Fact Generator",
@@ -99,6 +88,13 @@ with st.sidebar:
         index=0
     )
     
+    # Facts for this category and model are fetched ahead of time: warm the
+    # pool when the selection changes (not on every rerun)
+    pool = get_fact_pool(category, model)
+    if st.session_state.get("fact_pool_selection") != (category, model):
+        st.session_state.fact_pool_selection = (category, model)
+        pool.prefetch()
+    
     # Clear facts button
     st.divider()
     if st.button("🗑️ Clear All Facts", use_container_width=True):
@@ -108,6 +104,17 @@ with st.sidebar:
     # Stats
     st.divider()
     st.metric("Total Facts", len(st.session_state.facts))
+    
+    with st.expander("⚡ Fact Pool"):
+        st.caption(f"{category} · {model}")
+        col_ready, col_rate = st.columns(2)
+        col_ready.metric("Ready", len(pool))
+        col_rate.metric("Hit Rate", f"{pool.hit_rate:.0f}%")
+        col_hits, col_misses = st.columns(2)
+        col_hits.metric("Hits", pool.hits)
+        col_misses.metric("Misses", pool.misses)
+        if pool.last_error:
+            st.caption(f"⚠️ Last refill failed: {pool.last_error}")
 
 # Main content area
 col1, col2 = st.columns([3, 1])
@@ -117,50 +124,14 @@ with col1:
     if st.button("✨ Generate New Fact", use_container_width=True, type="primary"):
         with st.spinner("Generating an interesting fact..."):
             try:
-                # Create prompt based on category
-                if category == "Random":
-                    prompt = "Generate a fascinating, true, and interesting random fact. Make it concise (1-2 sentences) and engaging. Provide the fact in BOTH English and Traditional Chinese. Format your response as:\n\nEnglish: [fact in English]\nTraditional Chinese: [fact in Traditional Chinese]"
-                else:
-                    prompt = f"Generate a fascinating, true, and interesting fact about {category.lower()}. Make it concise (1-2 sentences) and engaging. Provide the fact in BOTH English and Traditional Chinese. Format your response as:\n\nEnglish: [fact in English]\nTraditional Chinese: [fact in Traditional Chinese]"
-                
-                # Get AI response
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a knowledgeable fact generator. Provide interesting, accurate, and engaging facts in both English and Traditional Chinese. Keep responses concise and factual. Always format your response with 'English:' and 'Traditional Chinese:' labels."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    stream=False
-                )
-                
-                response_text = response.choices[0].message.content.strip()
-                
-                # Parse English and Traditional Chinese from response
-                fact_text_en = ""
-                fact_text_zh_tw = ""
-                
-                if "English:" in response_text and "Traditional Chinese:" in response_text:
-                    parts = response_text.split("Traditional Chinese:")
-                    if len(parts) == 2:
-                        fact_text_en = parts[0].replace("English:", "").strip()
-                        fact_text_zh_tw = parts[1].strip()
-                elif "English:" in response_text:
-                    fact_text_en = response_text.replace("English:", "").strip()
-                elif "Traditional Chinese:" in response_text:
-                    fact_text_zh_tw = response_text.replace("Traditional Chinese:", "").strip()
-                else:
-                    # Fallback: treat entire response as English
-                    fact_text_en = response_text
-                
+                # Usually ready already; otherwise waits for the next batch
+                fact = pool.get()
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 
                 # Add fact to session state
                 st.session_state.facts.append({
-                    "text_en": fact_text_en,
-                    "text_zh_tw": fact_text_zh_tw,
+                    "text_en": fact["text_en"],
+                    "text_zh_tw": fact["text_zh_tw"],
                     "category": category,
                     "timestamp": timestamp
                 })
@@ -0,0 +1,194 @@
+"""
+Prefetched facts for fact_generator_app.py.
+
+Each (category, model) pair has a FactPool of ready bilingual facts. The
+pool is topped up on the shared background executor whenever it drops below
+its low-water mark, and each refill asks the model for a whole batch of
+facts as JSON in a single call, so clicking "Generate" normally just pops a
+fact that is already there. The app warms a pool when its category and
+model are selected; after a failed refill, warming waits RETRY_SECONDS. A
+click that finds the pool empty never waits for a batch: it asks for a
+single fact right away while a batch refills the pool in the background.
+Pools are shared by all sessions in the process (the most recently used
+MAX_POOLS of them) and count hits (fact was ready) and misses (had to wait
+for the model).
+"""
+
+import json
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from llm_client import chat_text, get_executor
+
+BATCH_SIZE = 5
+LOW_WATER = 2
+# Recently served facts remembered per pool, to drop repeats from new batches
+SEEN_LIMIT = 200
+# After a failed refill, wait this long before trying again in the background
+RETRY_SECONDS = 15
+# (category, model) pools kept at once
+MAX_POOLS = 32
+
+SYSTEM_PROMPT = ("You are a knowledgeable fact generator. Provide interesting, accurate, and engaging "
+                 "facts in both English and Traditional Chinese. Keep responses concise and factual.")
+
+
+def batch_prompt(category, count):
+    topic = "random topics" if category == "Random" else category.lower()
+    return (f"Generate {count} different fascinating, true, and interesting facts about {topic}. "
+            "Make each one concise (1-2 sentences) and engaging, and provide each in BOTH English "
+            "and Traditional Chinese. Reply with JSON only, in this format:\n"
+            '{"facts": [{"en": "fact in English", "zh_tw": "fact in Traditional Chinese"}]}')
+
+
+def single_prompt(category):
+    topic = "random" if category == "Random" else f"about {category.lower()}"
+    return (f"Generate a fascinating, true, and interesting fact {topic}. Make it concise (1-2 sentences) "
+            "and engaging. Provide the fact in BOTH English and Traditional Chinese. Format your response as:"
+            "\n\nEnglish: [fact in English]\nTraditional Chinese: [fact in Traditional Chinese]")
+
+
+def parse_bilingual_fact(text):
+    """Split an "English: ... Traditional Chinese: ..." reply into its two parts."""
+    text = text.strip()
+    if "English:" in text and "Traditional Chinese:" in text:
+        english, chinese = text.split("Traditional Chinese:", 1)
+        return {"text_en": english.replace("English:", "").strip(), "text_zh_tw": chinese.strip()}
+    if "Traditional Chinese:" in text:
+        return {"text_en": "", "text_zh_tw": text.replace("Traditional Chinese:", "").strip()}
+    return {"text_en": text.replace("English:", "").strip(), "text_zh_tw": ""}
+
+
+def parse_fact_batch(text):
+    """Return the facts in a batch reply, or [] if it isn't the JSON asked for."""
+    # Models sometimes wrap the JSON in ``` fences or add a sentence around it
+    match = re.search(r"[\[{].*[\]}]", text, re.DOTALL)
+    try:
+        data = json.loads(match.group(0)) if match else None
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        data = data.get("facts")
+    if not isinstance(data, list):
+        return []
+
+    facts = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        english = str(item.get("en") or item.get("english") or "").strip()
+        chinese = str(item.get("zh_tw") or item.get("zh") or item.get("chinese") or "").strip()
+        if english or chinese:
+            facts.append({"text_en": english, "text_zh_tw": chinese})
+    return facts
+
+
+def fetch_fact_batch(category, model, count=BATCH_SIZE):
+    text = chat_text(
+        model=model,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": batch_prompt(category, count)},
+        ],
+    )
+    return parse_fact_batch(text or "")
+
+
+def fetch_single_fact(category, model):
+    text = chat_text(
+        model=model,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT + " Always format your response with 'English:' "
+                                                          "and 'Traditional Chinese:' labels."},
+            {"role": "user", "content": single_prompt(category)},
+        ],
+    )
+    fact = parse_bilingual_fact(text or "")
+    if not fact["text_en"] and not fact["text_zh_tw"]:
+        raise ValueError("The model did not return a fact")
+    return fact
+
+
+class FactPool:
+    def __init__(self, category, model, batch_size=BATCH_SIZE, low_water=LOW_WATER):
+        self.category = category
+        self.model = model
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.errors = 0
+        self.last_error = None
+        self._facts = deque()
+        self._seen = deque(maxlen=SEEN_LIMIT)
+        self._lock = threading.Lock()
+        self._refill = None  # Future of the refill in progress
+        self._retry_at = 0.0
+
+    def __len__(self):
+        return len(self._facts)
+
+    @property
+    def hit_rate(self):
+        served = self.hits + self.misses
+        return self.hits / served * 100 if served else 0.0
+
+    def prefetch(self):
+        """Start a background refill if the pool is low and not backing off (never blocks)."""
+        with self._lock:
+            self._start_refill_locked(force=False)
+
+    def get(self):
+        """
+        Return a ready fact, or on a miss fetch one fact on its own (the
+        pool is refilled in the background meanwhile, not waited on).
+        """
+        with self._lock:
+            if self._facts:
+                self.hits += 1
+                fact = self._facts.popleft()
+                self._start_refill_locked(force=False)
+                return fact
+            self.misses += 1
+            self._start_refill_locked(force=True)
+        return fetch_single_fact(self.category, self.model)
+
+    def _start_refill_locked(self, force):
+        # force (a click that missed) skips the backoff after a failed refill
+        if self._refill is not None:
+            return
+        if not force and (len(self._facts) >= self.low_water or time.monotonic() < self._retry_at):
+            return
+        self._refill = get_executor().submit(self._run_refill)
+
+    def _run_refill(self):
+        try:
+            facts = fetch_fact_batch(self.category, self.model, self.batch_size)
+            if not facts:
+                raise ValueError("The model's batch reply had no facts")
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self.last_error = str(e)
+                self._retry_at = time.monotonic() + RETRY_SECONDS
+                self._refill = None
+            return
+        with self._lock:
+            self.refills += 1
+            self.last_error = None
+            for fact in facts:
+                key = fact["text_en"] or fact["text_zh_tw"]
+                if key not in self._seen:
+                    self._seen.append(key)
+                    self._facts.append(fact)
+            self._refill = None
+
+
+@lru_cache(maxsize=MAX_POOLS)
+def get_fact_pool(category, model):
+    """Process-wide pool for one category and model."""
+    return FactPool(category, model)
@@ -1,18 +1,93 @@
-import os
 import streamlit as st
-import openai
-from dotenv import load_dotenv
+from llm_client import chat_text, get_executor
+from image_store import ImageStore
 import re
 import requests
 
-load_dotenv()
-API_KEY = os.getenv("API_KEY")
+# Seconds a cached Qwen-Image answer is reused (the image links expire)
+IMAGE_CACHE_TTL = 30 * 60
+IMAGE_URL_PATTERN = re.compile(r'https?://[^\s\)]+')
 
-# Initialize OpenAI client
-client = openai.OpenAI(
-    api_key=API_KEY,
-    base_url="https://api.poe.com/v1",
-)
+# Once the recipe is shown, wait this long for the (usually better) AI-written
+# image prompt before drawing the simple colour prompt instead
+IMAGE_PROMPT_WAIT_SECONDS = 10
+
+@st.cache_resource
+def get_image_store():
+    # Downloaded images and their display-size copies, shared by all sessions
+    return ImageStore(root=".image_cache", max_bytes=200 * 1024 * 1024, display_width=900)
+
+
+def show_image(image_key, image_url, caption=None):
+    # Serve the locally stored copy; fall back to the remote link if it is gone
+    image_bytes = get_image_store().thumbnail(image_key) if image_key else None
+    if image_bytes:
+        st.image(image_bytes, caption=caption, use_container_width=True)
+    elif image_url:
+        st.image(image_url, caption=caption, use_container_width=True)
+
+
+COLOR_NAMES = {"紅色": "red", "橙色": "orange", "黃色": "yellow", "綠色": "green", "藍色": "blue", "紫色": "purple", "粉紅色": "pink", "白色": "white", "黑色": "black", "金色": "gold"}
+
+
+def generate_image(image_prompt):
+    # Use chat completions with Qwen-Image model (as shown in basic_openai.py)
+    # Image links expire, so cached image answers are kept for a shorter time.
+    # Only answers with a link are cached; a failed generation is retried next time.
+    image_url = chat_text(
+        model="Qwen-Image",
+        messages=[
+            {"role": "user", "content": image_prompt}
+        ],
+        extra_body={
+            "aspect": "3:2",    # Options: "1:1", "3:2", "2:3", "auto"
+            "quality": "high"   # Options: "low", "medium", "high"
+        },
+        cache=True,
+        ttl=IMAGE_CACHE_TTL,
+        cache_if=IMAGE_URL_PATTERN.search
+    )
+    
+    # Extract URL if it's embedded in text
+    url_match = IMAGE_URL_PATTERN.search(image_url or "")
+    if not url_match:
+        raise ValueError("Qwen-Image did not return an image link")
+    return url_match.group(0)
+
+
+def write_image_prompt(image_prompt_text):
+    # Ask the AI to write the image prompt (runs while the recipe is shown)
+    return chat_text(
+        model="gemini-2.5-pro",
+        messages=[
+            {"role": "user", "content": image_prompt_text}
+        ],
+        cache=True
+    ).strip()
+
+
+def draw_recipe_image(prompt_future, simple_prompt):
+    """
+    Draw one image: from the AI-written prompt if it is ready in time,
+    otherwise from the simple prompt.
+
+    Only the prompts race; Qwen-Image is paid per image, so it is called a
+    second time (with the simple prompt) only if the first drawing fails.
+    """
+    try:
+        image_prompt = prompt_future.result(timeout=IMAGE_PROMPT_WAIT_SECONDS) or simple_prompt
+    except Exception:
+        prompt_future.cancel()
+        image_prompt = simple_prompt
+    try:
+        return generate_image(image_prompt)
+    except Exception as first_error:
+        if image_prompt == simple_prompt:
+            raise
+        try:
+            return generate_image(simple_prompt)
+        except Exception as fallback_error:
+            raise Exception(f"Qwen-Image generation failed: {first_error}; {fallback_error}")
 
 st.set_page_config(page_title="食譜探索器", page_icon="🍳", layout="wide")
 
@@ -107,139 +182,102 @@ if generate_button:
 
 用繁體中文（粵語）寫，要簡潔、有創意、溫暖。食譜要簡短，重點突出，避免冗長描述。"""
     
-    with st.spinner("生成緊食譜..."):
-        try:
-            response = client.chat.completions.create(
+    try:
+        with st.spinner("生成緊食譜..."):
+            # Identical form answers are served from the response cache
+            recipe = chat_text(
                 model="gemini-2.5-pro",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                stream=False
+                cache=True
             )
-            
-            recipe = response.choices[0].message.content
-            
-            # Extract recipe title (first line or first heading)
-            recipe_title = "美味食譜"
-            lines = recipe.split('\n')
-            for line in lines[:5]:  # Check first 5 lines
-                line = line.strip()
-                if line and not line.startswith('#') and len(line) < 100:
-                    # Remove markdown formatting
-                    recipe_title = re.sub(r'^#+\s*', '', line)
-                    recipe_title = re.sub(r'\*\*', '', recipe_title)
-                    recipe_title = recipe_title.strip()
-                    if recipe_title:
-                        break
-            
-            # Generate image prompt using AI
-            image_prompt_text = f"""為呢個食譜創造一個詳細嘅圖片生成提示：{recipe_title}
-            
-            考慮：
-            - 心情：{question1 if question1 else '任何'}
-            - 顏色主題：{question2 if question2 else '任何'}
-            - 時段：{question3 if question3 else '任何'}
-            - 食譜描述：{recipe[:200]}...
-            
-            只返回一個簡潔、詳細嘅圖片提示（唔好解釋），適合用嚟創造一張吸引、專業嘅食物照片。用繁體中文寫圖片提示。"""
-            
-            image_url = None
-            
+        
+        # Extract recipe title (first line or first heading)
+        recipe_title = "美味食譜"
+        lines = recipe.split('\n')
+        for line in lines[:5]:  # Check first 5 lines
+            line = line.strip()
+            if line and not line.startswith('#') and len(line) < 100:
+                # Remove markdown formatting
+                recipe_title = re.sub(r'^#+\s*', '', line)
+                recipe_title = re.sub(r'\*\*', '', recipe_title)
+                recipe_title = recipe_title.strip()
+                if recipe_title:
+                    break
+        
+        # Generate image prompt using AI
+        image_prompt_text = f"""為呢個食譜創造一個詳細嘅圖片生成提示：{recipe_title}
+        
+        考慮：
+        - 心情：{question1 if question1 else '任何'}
+        - 顏色主題：{question2 if question2 else '任何'}
+        - 時段：{question3 if question3 else '任何'}
+        - 食譜描述：{recipe[:200]}...
+        
+        只返回一個簡潔、詳細嘅圖片提示（唔好解釋），適合用嚟創造一張吸引、專業嘅食物照片。用繁體中文寫圖片提示。"""
+        
+        # Simple English prompt built from the colour, used if the AI-written one is late or fails
+        color_name = COLOR_NAMES.get(question2, "")
+        simple_prompt = f"A beautiful, professional food photograph of {recipe_title}"
+        if color_name:
+            simple_prompt += f" with {color_name} color accents"
+        simple_prompt += ", appetizing, well-lit, high quality"
+        
+        # Write the image prompt in the background, then show the recipe straight away
+        prompt_future = get_executor().submit(write_image_prompt, image_prompt_text)
+        
+        st.balloons()
+        st.success("食譜已生成！")
+        st.divider()
+        
+        image_placeholder = st.empty()
+        st.markdown(recipe)
+        
+        st.session_state.last_recipe = recipe
+        st.session_state.last_image_url = None
+        st.session_state.last_image_key = None
+        st.session_state.recipe_preferences = {
+            "question1": question1,
+            "question2": question2,
+            "question3": question3,
+            "question4": question4,
+            "question5": question5,
+            "question6": question6
+        }
+        
+        # Fill in the image once it is drawn
+        image_url = None
+        error_msg = "冇收到圖片連結"
+        with image_placeholder.container():
+            with st.spinner("用 Qwen-Image 生成緊圖片..."):
+                try:
+                    image_url = draw_recipe_image(prompt_future, simple_prompt)
+                except Exception as img_error:
+                    error_msg = str(img_error)
+        
+        if image_url:
+            # Download once and keep a local copy (the link will expire)
             try:
-                # Generate optimized image prompt
-                image_prompt_response = client.chat.completions.create(
-                    model="gemini-2.5-pro",
-                    messages=[
-                        {"role": "user", "content": image_prompt_text}
-                    ],
-                    stream=False
-                )
-                image_prompt = image_prompt_response.choices[0].message.content.strip()
-                
-                # Generate image using Qwen-Image (following basic_openai.py pattern)
-                with st.spinner("用 Qwen-Image 生成緊圖片..."):
-                    try:
-                        # Use chat completions with Qwen-Image model (as shown in basic_openai.py)
-                        qwen_response = client.chat.completions.create(
-                            model="Qwen-Image",
-                            messages=[
-                                {"role": "user", "content": image_prompt}
-                            ],
-                            extra_body={
-                                "aspect": "3:2",    # Options: "1:1", "3:2", "2:3", "auto"
-                                "quality": "high"   # Options: "low", "medium", "high"
-                            },
-                            stream=False
-                        )
-                        # Get image URL from response content (as shown in basic_openai.py)
-                        image_url = qwen_response.choices[0].message.content
-                        
-                        # Extract URL if it's embedded in text
-                        url_match = re.search(r'https?://[^\s\)]+', image_url)
-                        if url_match:
-                            image_url = url_match.group(0)
-                            
-                    except Exception as qwen_error:
-                        # Fallback: try with simple prompt
-                        try:
-                            color_name = {"紅色": "red", "橙色": "orange", "黃色": "yellow", "綠色": "green", "藍色": "blue", "紫色": "purple", "粉紅色": "pink", "白色": "white", "黑色": "black", "金色": "gold"}.get(question2, "")
-                            simple_prompt = f"A beautiful, professional food photograph of {recipe_title}"
-                            if color_name:
-                                simple_prompt += f" with {color_name} color accents"
-                            simple_prompt += ", appetizing, well-lit, high quality"
-                            
-                            qwen_response = client.chat.completions.create(
-                                model="Qwen-Image",
-                                messages=[
-                                    {"role": "user", "content": simple_prompt}
-                                ],
-                                extra_body={
-                                    "aspect": "3:2",
-                                    "quality": "high"
-                                },
-                                stream=False
-                            )
-                            image_url = qwen_response.choices[0].message.content
-                            url_match = re.search(r'https?://[^\s\)]+', image_url)
-                            if url_match:
-                                image_url = url_match.group(0)
-                        except Exception as e:
-                            raise Exception(f"Qwen-Image generation failed: {str(e)}")
-                            
-            except Exception as img_error:
-                error_msg = str(img_error)
-                st.info(f"💡 圖片生成不可用：{error_msg[:150]}。食譜已成功生成！")
-            
-            st.balloons()
-            st.success("食譜已生成！")
-            st.divider()
-            
-            # Display image if generated
-            if image_url:
-                st.image(image_url, caption=recipe_title, use_container_width=True)
+                image_key = get_image_store().fetch(image_url)
+            except Exception:
+                image_key = None
+            with image_placeholder.container():
+                show_image(image_key, image_url, caption=recipe_title)
                 st.divider()
-            
-            st.markdown(recipe)
-            
-            st.session_state.last_recipe = recipe
             st.session_state.last_image_url = image_url
-            st.session_state.recipe_preferences = {
-                "question1": question1,
-                "question2": question2,
-                "question3": question3,
-                "question4": question4,
-                "question5": question5,
-                "question6": question6
-            }
-            
-        except Exception as e:
-            st.error(f"生成食譜時出錯：{str(e)}")
-            st.info("請檢查你嘅 API 金鑰同連線，然後再試一次。")
+            st.session_state.last_image_key = image_key
+        else:
+            image_placeholder.info(f"💡 圖片生成不可用：{error_msg[:150]}。食譜已成功生成！")
+        
+    except Exception as e:
+        st.error(f"生成食譜時出錯：{str(e)}")
+        st.info("請檢查你嘅 API 金鑰同連線，然後再試一次。")
 
 if "last_recipe" in st.session_state:
     with st.expander("查看上次生成嘅食譜"):
-        if "last_image_url" in st.session_state and st.session_state.last_image_url:
-            st.image(st.session_state.last_image_url, use_container_width=True)
+        if st.session_state.get("last_image_url"):
+            show_image(st.session_state.get("last_image_key"), st.session_state.last_image_url)
         st.markdown(st.session_state.last_recipe)
 
@@ -0,0 +1,138 @@
+"""
+Local store for generated images.
+
+Generated image links are large and expire after a while. The store downloads
+each image once, keeps the full-size file plus small WebP copies for display
+on disk, and deletes the least recently used files when the folder grows past
+its size budget. Files are named by a hash of the URL, and originals always
+end in ".img" whatever their format, so looking one up is a single stat.
+"""
+
+import hashlib
+import io
+import os
+import threading
+
+import requests
+from PIL import Image
+
+# Largest image we are willing to download
+MAX_DOWNLOAD_BYTES = 25 * 1024 * 1024
+# Originals are read back with Image.open, which detects the format itself
+ORIGINAL_EXTENSION = ".img"
+
+
+class ImageStore:
+    def __init__(self, root=".image_cache", max_bytes=200 * 1024 * 1024, display_width=800):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.display_width = display_width
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def fetch(self, url):
+        """Download `url` (unless already stored) and return its key."""
+        key = self.key_for(url)
+        if self._original_path(key) is not None:
+            return key
+
+        response = requests.get(url, timeout=30, stream=True)
+        response.raise_for_status()
+        data = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            data.write(chunk)
+            if data.tell() > MAX_DOWNLOAD_BYTES:
+                raise ValueError("Image is too large to store")
+
+        # Check that it really is an image before keeping it
+        data.seek(0)
+        with Image.open(data):
+            pass
+        path = self._original_path(key, must_exist=False)
+        with self._lock:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data.getvalue())
+            os.replace(tmp_path, path)
+            self._evict(keep=key)
+        return key
+
+    def has(self, key):
+        return self._original_path(key) is not None
+
+    def original(self, key):
+        path = self._original_path(key)
+        if path is None:
+            return None
+        self._touch(path)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def thumbnail(self, key, width=None):
+        """WebP bytes of the image scaled to `width` pixels (made on first use)."""
+        width = width or self.display_width
+        thumb_path = os.path.join(self.root, f"{key}_{width}.webp")
+        if os.path.exists(thumb_path):
+            self._touch(thumb_path)
+            with open(thumb_path, "rb") as f:
+                return f.read()
+
+        path = self._original_path(key)
+        if path is None:
+            return None
+        self._touch(path)
+        with Image.open(path) as image:
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            if image.width > width:
+                height = round(image.height * width / image.width)
+                image = image.resize((width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, format="WEBP", quality=85, method=4)
+        thumb_bytes = buffer.getvalue()
+
+        with self._lock:
+            tmp_path = thumb_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(thumb_bytes)
+            os.replace(tmp_path, thumb_path)
+            self._evict(keep=key)
+        return thumb_bytes
+
+    def _original_path(self, key, must_exist=True):
+        path = os.path.join(self.root, key + ORIGINAL_EXTENSION)
+        if must_exist and not os.path.exists(path):
+            return None
+        return path
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict(self, keep=None):
+        files = []
+        total = 0
+        for entry in os.scandir(self.root):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.path, entry.name, stat.st_size))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        # Oldest (least recently used) files go first
+        for _, path, name, size in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if keep and name.startswith(keep):
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
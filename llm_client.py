@@ -0,0 +1,114 @@
+"""
+Shared OpenAI-compatible client for all the apps.
+
+Streamlit re-runs the whole app script on every click, so building a new
+`openai.OpenAI(...)` at the top of each app opens fresh connections (and TLS
+handshakes) again and again. Modules stay imported between reruns, so the
+client built here is created once per process and reused by every app,
+session and rerun.
+
+Settings can be changed with environment variables (or the .env file):
+    API_KEY                 Poe API key
+    LLM_BASE_URL            default https://api.poe.com/v1
+    LLM_TIMEOUT             seconds to wait for a response (default 120)
+    LLM_CONNECT_TIMEOUT     seconds to wait for a connection (default 10)
+    LLM_MAX_RETRIES         retries on 408/409/429/5xx and network errors (default 3)
+    LLM_MAX_CONNECTIONS     size of the HTTP connection pool (default 20)
+    LLM_BACKGROUND_WORKERS  threads for background LLM calls (default 8)
+    LLM_KEEPALIVE_SECONDS   how long idle connections are kept open (default 60)
+    LLM_CACHE_DB            SQLite file for the response cache (memory only if unset)
+    LLM_CACHE_TTL           default seconds a cached response stays valid (default 3600)
+    LLM_CACHE_MAX_ENTRIES   responses kept in memory (default 256)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import httpx
+import openai
+from dotenv import load_dotenv
+
+from response_cache import ResponseCache, make_cache_key
+
+load_dotenv()
+API_KEY = os.getenv("API_KEY")
+BASE_URL = os.getenv("LLM_BASE_URL", "https://api.poe.com/v1")
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return float(default)
+
+
+@lru_cache(maxsize=1)
+def get_client():
+    """Return the process-wide client (built on first use)."""
+    max_connections = int(_env_float("LLM_MAX_CONNECTIONS", 20))
+    http_client = openai.DefaultHttpxClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=_env_float("LLM_KEEPALIVE_SECONDS", 60),
+        ),
+        timeout=httpx.Timeout(
+            _env_float("LLM_TIMEOUT", 120),
+            connect=_env_float("LLM_CONNECT_TIMEOUT", 10),
+        ),
+    )
+    # The SDK retries 408/409/429/5xx and connection errors itself, with
+    # exponential backoff plus random jitter (and honours Retry-After).
+    return openai.OpenAI(
+        api_key=API_KEY,
+        base_url=BASE_URL,
+        max_retries=int(_env_float("LLM_MAX_RETRIES", 3)),
+        http_client=http_client,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_executor():
+    """Process-wide thread pool for running LLM calls in the background."""
+    return ThreadPoolExecutor(
+        max_workers=int(_env_float("LLM_BACKGROUND_WORKERS", 8)),
+        thread_name_prefix="llm",
+    )
+
+
+@lru_cache(maxsize=1)
+def get_response_cache():
+    """Process-wide response cache. Set LLM_CACHE_DB to also keep it on disk."""
+    return ResponseCache(
+        max_entries=int(_env_float("LLM_CACHE_MAX_ENTRIES", 256)),
+        default_ttl=_env_float("LLM_CACHE_TTL", 3600),
+        db_path=os.getenv("LLM_CACHE_DB") or None,
+    )
+
+
+def chat_text(model, messages, extra_body=None, cache=False, ttl=None, cache_if=None):
+    """
+    Run a (non-streaming) chat completion and return the reply text.
+
+    With cache=True an identical earlier request (same model, messages and
+    extra_body) is answered from the response cache without calling the API.
+    `cache_if(text)` can reject replies that should not be cached (e.g. a
+    failed generation), so the next identical request tries again.
+    """
+    key = None
+    if cache:
+        key = make_cache_key(model, messages, extra_body)
+        cached = get_response_cache().get(key)
+        if cached is not None:
+            return cached
+
+    kwargs = {"model": model, "messages": messages, "stream": False}
+    if extra_body:
+        kwargs["extra_body"] = extra_body
+    response = get_client().chat.completions.create(**kwargs)
+    text = response.choices[0].message.content
+
+    if cache and text and (cache_if is None or cache_if(text)):
+        get_response_cache().set(key, text, ttl=ttl)
+    return text
@@ -1,6 +1,7 @@
 import streamlit as st
-import random
 import time
+from question_bank import QuestionBank
+from quiz_stats import HistoryRing, RunningStats
 from datetime import datetime, timedelta
 
 st.set_page_config(
@@ -134,14 +135,13 @@ if "score" not in st.session_state:
     st.session_state.wrong_answers = 0
     st.session_state.current_question = None
     st.session_state.current_answer = None
-    st.session_state.question_history = []
+    st.session_state.question_history = HistoryRing(capacity=50, spill_to_disk=True)
     st.session_state.quiz_started = False
     st.session_state.start_time = None
     st.session_state.last_result = None
     st.session_state.question_start_time = None
-    st.session_state.time_per_question = []
-    st.session_state.total_time = 0
-    st.session_state.last_refresh_time = None
+    st.session_state.time_stats = RunningStats()
+    st.session_state.question_banks = {}
 
 # Sidebar for settings
 with st.sidebar:
@@ -159,6 +159,12 @@ with st.sidebar:
         help="Choose which operations to practice"
     )
     
+    class_seed = st.text_input(
+        "Class Code (optional):",
+        placeholder="e.g. 2024",
+        help="Students who enter the same number get the same questions in the same order. Enter it before starting (or press Reset Quiz)."
+    )
+    
     st.markdown("---")
     st.header("📊 Statistics")
     
@@ -172,18 +178,18 @@ with st.sidebar:
             accuracy = (st.session_state.correct_answers / st.session_state.total_questions) * 100
             st.metric("Accuracy", f"{accuracy:.1f}%")
     
-    # Time statistics
-    if st.session_state.total_questions > 0 and st.session_state.time_per_question:
-        avg_time = sum(st.session_state.time_per_question) / len(st.session_state.time_per_question)
-        st.metric("Avg Time/Question", f"{avg_time:.1f}s")
+    # Time statistics (running totals, updated once per answer)
+    time_stats = st.session_state.time_stats
+    if st.session_state.total_questions > 0 and time_stats.count:
+        st.metric("Avg Time/Question", f"{time_stats.mean:.1f}s")
         
-        if st.session_state.total_time > 0:
-            questions_per_minute = (st.session_state.total_questions / st.session_state.total_time) * 60
+        if time_stats.total > 0:
+            questions_per_minute = (st.session_state.total_questions / time_stats.total) * 60
             st.metric("Questions/Min", f"{questions_per_minute:.1f}")
     
     # Score/Time ratio
-    if st.session_state.total_time > 0 and st.session_state.correct_answers > 0:
-        score_per_second = st.session_state.correct_answers / st.session_state.total_time
+    if time_stats.total > 0 and st.session_state.correct_answers > 0:
+        score_per_second = st.session_state.correct_answers / time_stats.total
         st.metric("Score/Time", f"{score_per_second:.2f}/s")
     
     st.markdown("---")
@@ -194,90 +200,28 @@ with st.sidebar:
         st.session_state.wrong_answers = 0
         st.session_state.current_question = None
         st.session_state.current_answer = None
-        st.session_state.question_history = []
+        st.session_state.question_history.clear()
         st.session_state.quiz_started = False
         st.session_state.start_time = None
         st.session_state.last_result = None
         st.session_state.question_start_time = None
-        st.session_state.time_per_question = []
-        st.session_state.total_time = 0
-        st.session_state.last_refresh_time = None
+        st.session_state.time_stats = RunningStats()
+        st.session_state.question_banks = {}
         st.rerun()
 
-# Function to generate a question
+# Function to generate a question (handed out from a pre-generated bank)
 def generate_question(difficulty_level, operation):
-    max_number_map = {
-        "Easy 🟢": 20,
-        "Medium 🟡": 100,
-        "Hard 🔴": 1000
-    }
-    max_num = max_number_map[difficulty_level]
-    
-    if operation == "All Operations":
-        operation = random.choice(["Addition", "Subtraction", "Multiplication", "Division"])
-    
-    operation_map = {
-        "Addition ➕": "Addition",
-        "Subtraction ➖": "Subtraction",
-        "Multiplication ✖️": "Multiplication",
-        "Division ➗": "Division"
-    }
-    
-    op = operation_map.get(operation, operation)
-    
-    if op == "Addition":
-        num1 = random.randint(1, max_num)
-        num2 = random.randint(1, max_num)
-        answer = num1 + num2
-        question = f"{num1} + {num2} = ?"
-        symbol = "➕"
-        
-    elif op == "Subtraction":
-        num1 = random.randint(1, max_num)
-        num2 = random.randint(1, num1)  # Ensure positive result
-        answer = num1 - num2
-        question = f"{num1} - {num2} = ?"
-        symbol = "➖"
-        
-    elif op == "Multiplication":
-        if difficulty_level == "Easy 🟢":
-            num1 = random.randint(1, 10)
-            num2 = random.randint(1, 10)
-        elif difficulty_level == "Medium 🟡":
-            num1 = random.randint(1, 20)
-            num2 = random.randint(1, 20)
-        else:  # Hard
-            num1 = random.randint(1, 50)
-            num2 = random.randint(1, 50)
-        answer = num1 * num2
-        question = f"{num1} × {num2} = ?"
-        symbol = "✖️"
-        
-    else:  # Division
-        if difficulty_level == "Easy 🟢":
-            num2 = random.randint(2, 10)
-            num1 = num2 * random.randint(1, 10)
-        elif difficulty_level == "Medium 🟡":
-            num2 = random.randint(2, 20)
-            num1 = num2 * random.randint(1, 20)
-        else:  # Hard
-            num2 = random.randint(2, 50)
-            num1 = num2 * random.randint(1, 50)
-        answer = num1 // num2
-        question = f"{num1} ÷ {num2} = ?"
-        symbol = "➗"
-    
-    return {
-        "question": question,
-        "answer": answer,
-        "symbol": symbol,
-        "operation": op
-    }
+    seed = int(class_seed) if class_seed.strip().isdigit() else None
+    bank_key = (difficulty_level, operation, seed)
+    bank = st.session_state.question_banks.get(bank_key)
+    if bank is None:
+        bank = QuestionBank(difficulty_level, operation, seed=seed)
+        st.session_state.question_banks[bank_key] = bank
+    return bank.next_question()
 
 # Initialize start time when page first loads
 if st.session_state.start_time is None:
     st.session_state.start_time = time.time()
-    st.session_state.last_refresh_time = time.time()
 
 # Generate new question if needed
 if st.session_state.current_question is None:
@@ -286,32 +230,31 @@ if st.session_state.current_question is None:
     if st.session_state.question_start_time is None:
         st.session_state.question_start_time = time.time()
 
-# Count-up timer - updates every second
-question_data = st.session_state.current_question
-current_time = time.time()
-
-# Initialize last_refresh_time if not set
-if st.session_state.last_refresh_time is None:
-    st.session_state.last_refresh_time = current_time
-
-# Calculate elapsed time from start
-elapsed_time = current_time - st.session_state.start_time
-minutes = int(elapsed_time // 60)
-seconds = int(elapsed_time % 60)
-
-# Calculate score per minute
-score_per_minute = 0
-if elapsed_time > 0:
-    score_per_minute = (st.session_state.correct_answers / elapsed_time) * 60
+# Count-up timer - only this fragment re-runs every second, the rest of the
+# page is rebuilt only when the user interacts with it
+@st.fragment(run_every=1)
+def show_timer():
+    # Calculate elapsed time from start
+    elapsed_time = time.time() - st.session_state.start_time
+    minutes = int(elapsed_time // 60)
+    seconds = int(elapsed_time % 60)
+    
+    # Calculate score per minute
+    score_per_minute = 0
+    if elapsed_time > 0:
+        score_per_minute = (st.session_state.correct_answers / elapsed_time) * 60
+    
+    # Display count-up timer with score per minute
+    timer_display = f"{minutes:02d}:{seconds:02d}"
+    st.markdown(f"""
+    <div class="timer-box">
+        ⏱️ Elapsed Time: {timer_display}
+        <div class="timer-info">Score/Minute: {score_per_minute:.2f}</div>
+    </div>
+    """, unsafe_allow_html=True)
 
-# Display count-up timer with score per minute
-timer_display = f"{minutes:02d}:{seconds:02d}"
-st.markdown(f"""
-<div class="timer-box">
-    ⏱️ Elapsed Time: {timer_display}
-    <div class="timer-info">Score/Minute: {score_per_minute:.2f}</div>
-</div>
-""", unsafe_allow_html=True)
+question_data = st.session_state.current_question
+show_timer()
 
 # Display current question
 st.markdown(f"""
@@ -343,14 +286,14 @@ with col_btn2:
 
 # Check answer
 if submit_clicked and user_answer is not None:
+    st.session_state.total_questions += 1
+    correct = user_answer == question_data['answer']
+    
     # Calculate time taken for this question
+    time_taken = None
     if st.session_state.question_start_time:
         time_taken = time.time() - st.session_state.question_start_time
-        st.session_state.time_per_question.append(time_taken)
-        st.session_state.total_time += time_taken
-    
-    st.session_state.total_questions += 1
-    correct = user_answer == question_data['answer']
+        st.session_state.time_stats.add(time_taken, correct, question_data['operation'])
     
     if correct:
         st.session_state.correct_answers += 1
@@ -364,10 +307,9 @@ if submit_clicked and user_answer is not None:
         result_emoji = "❌"
         result_text = f"Wrong! The correct answer is {question_data['answer']}"
     
-    # Calculate time taken for display
+    # Time taken for display
     time_taken_display = ""
-    if st.session_state.question_start_time:
-        time_taken = time.time() - st.session_state.question_start_time
+    if time_taken is not None:
         time_taken_display = f" (Time: {time_taken:.1f}s)"
     
     st.session_state.last_result = {
@@ -381,9 +323,11 @@ if submit_clicked and user_answer is not None:
     # Add to history
     st.session_state.question_history.append({
         "question": question_data['question'],
+        "operation": question_data['operation'],
         "user_answer": user_answer,
         "correct_answer": question_data['answer'],
         "correct": correct,
+        "seconds": round(time_taken, 2) if time_taken is not None else "",
         "time_taken": time_taken_display
     })
     
@@ -491,8 +435,8 @@ if st.session_state.total_questions > 0:
         """.format(time_display), unsafe_allow_html=True)
     
     with col_time2:
-        if st.session_state.time_per_question:
-            avg_time = sum(st.session_state.time_per_question) / len(st.session_state.time_per_question)
+        if time_stats.count:
+            avg_time = time_stats.mean
             st.markdown("""
             <div class="stats-card">
                 <div class="metric-label">⚡ Avg Time/Q</div>
@@ -508,8 +452,8 @@ if st.session_state.total_questions > 0:
             """, unsafe_allow_html=True)
     
     with col_time3:
-        if st.session_state.total_time > 0:
-            questions_per_minute = (st.session_state.total_questions / st.session_state.total_time) * 60
+        if time_stats.total > 0:
+            questions_per_minute = (st.session_state.total_questions / time_stats.total) * 60
             st.markdown("""
             <div class="stats-card">
                 <div class="metric-label">🚀 Speed</div>
@@ -525,8 +469,8 @@ if st.session_state.total_questions > 0:
             """, unsafe_allow_html=True)
     
     with col_time4:
-        if st.session_state.total_time > 0 and st.session_state.correct_answers > 0:
-            score_per_second = st.session_state.correct_answers / st.session_state.total_time
+        if time_stats.total > 0 and st.session_state.correct_answers > 0:
+            score_per_second = st.session_state.correct_answers / time_stats.total
             st.markdown("""
             <div class="stats-card">
                 <div class="metric-label">💯 Score/Time</div>
@@ -541,14 +485,29 @@ if st.session_state.total_questions > 0:
             </div>
             """, unsafe_allow_html=True)
 
+    # Per-operation breakdown
+    if time_stats.by_operation:
+        with st.expander("🔢 By Operation"):
+            fastest = f"{time_stats.min:.1f}s" if time_stats.min is not None else "-"
+            slowest = f"{time_stats.max:.1f}s" if time_stats.max is not None else "-"
+            st.caption(f"Fastest: {fastest} • Slowest: {slowest} • Spread (std dev): {time_stats.stddev:.1f}s")
+            st.table([
+                {
+                    "Operation": op,
+                    "Questions": op_stats["count"],
+                    "Accuracy": f"{op_stats['correct'] / op_stats['count'] * 100:.0f}%",
+                    "Avg Time": f"{op_stats['total'] / op_stats['count']:.1f}s"
+                }
+                for op, op_stats in time_stats.by_operation.items()
+            ])
+
 # Question history
-if st.session_state.question_history:
+if len(st.session_state.question_history):
     st.markdown("---")
     st.subheader("📜 Recent Questions")
     
     # Show last 10 questions in a nicer format
-    recent_history = list(reversed(st.session_state.question_history[-10:]))
-    for i, q in enumerate(recent_history, 1):
+    for i, q in enumerate(st.session_state.question_history.recent(10), 1):
         status = "✅" if q["correct"] else "❌"
         timeout_marker = " ⏱️" if q.get("timeout") else ""
         time_info = q.get("time_taken", "")
@@ -562,16 +521,16 @@ if st.session_state.question_history:
         </div>
         """, unsafe_allow_html=True)
 
+    # Full history (including answers no longer kept in memory) as CSV,
+    # built only when the button is clicked
+    st.download_button(
+        "📥 Download History (CSV)",
+        data=st.session_state.question_history.export_csv,
+        file_name="quiz_history.csv",
+        mime="text/csv",
+        on_click="ignore"
+    )
+
 # Instructions
 if not st.session_state.quiz_started:
     st.info("👆 Configure your quiz settings in the sidebar and start answering questions!")
-
-# Auto-refresh timer every second (at the end to avoid interrupting user interactions)
-current_time_end = time.time()
-if st.session_state.last_refresh_time is None:
-    st.session_state.last_refresh_time = current_time_end
-
-time_since_last_refresh = current_time_end - st.session_state.last_refresh_time
-if time_since_last_refresh >= 1.0:
-    st.session_state.last_refresh_time = current_time_end
-    st.rerun()
@@ -0,0 +1,165 @@
+"""
+Benchmark for the study planner's scheduling.
+
+Builds synthetic assignment sets (10 up to 100k tasks, with short, semester
+and year-long due-date spreads) and times planner_core.schedule_assignments
+on each. For every case it reports wall time, peak memory (tracemalloc) and
+the number of sessions produced, and writes everything as JSON so runs from
+different commits can be compared:
+
+    python planner_benchmark.py --output bench_before.json
+    python planner_benchmark.py --compare bench_before.json
+    python planner_benchmark.py --optimize --sizes 100 300 --spreads semester
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+
+from planner_core import DEFAULT_PREFERENCES, schedule_assignments
+from planner_optimizer import optimize_schedule
+
+SIZES = [10, 100, 1000, 10000, 100000]
+# Due dates are spread from a few days overdue up to this many days ahead
+SPREADS = {"week": 7, "semester": 120, "year": 365}
+# Fixed "today" so every run plans exactly the same work
+BENCH_TODAY = date(2025, 1, 6)
+COURSES = ["Mathematics", "Computer Science", "Physics", "Literature", "Chemistry", "History"]
+
+
+def make_assignments(count, spread_days, seed=0):
+    rng = random.Random(seed)
+    assignments = []
+    for i in range(count):
+        due = BENCH_TODAY + timedelta(days=rng.randint(-3, spread_days))
+        assignments.append({
+            "id": i + 1,
+            "course": rng.choice(COURSES),
+            "task": f"Task {i + 1}",
+            "due_date": due.strftime('%Y-%m-%d'),
+            "priority": rng.choices(["High", "Medium", "Low"], weights=[2, 5, 3])[0],
+            "hours": rng.choice([0.5, 1, 1.5, 2, 3, 4, 6, 8, 12, 20]),
+        })
+    return assignments
+
+
+def run_case(assignments, preferences, repeat, planner=schedule_assignments):
+    # Best of `repeat` runs for the time; a separate traced run for memory
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        plan = planner(assignments, preferences, today=BENCH_TODAY)
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    planner(assignments, preferences, today=BENCH_TODAY)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_seconds": min(times),
+        "mean_seconds": sum(times) / len(times),
+        "peak_memory_bytes": peak,
+        "sessions": len(plan['sessions']),
+        "overdue": len(plan['overdue']),
+        "unscheduled_hours": round(sum(t['unscheduled_hours'] for t in plan['tasks']), 2),
+        "mode": plan.get('mode', "greedy"),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print time/memory ratios against an earlier run; return True on regression."""
+    old_cases = {(c["tasks"], c["spread"]): c for c in baseline["cases"]}
+    regressed = False
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:", file=sys.stderr)
+    for case in results["cases"]:
+        old = old_cases.get((case["tasks"], case["spread"]))
+        if old is None:
+            continue
+        time_ratio = case["wall_seconds"] / max(old["wall_seconds"], 1e-9)
+        memory_ratio = case["peak_memory_bytes"] / max(old["peak_memory_bytes"], 1)
+        flag = ""
+        if time_ratio > threshold or memory_ratio > threshold:
+            flag = "  <-- regression"
+            regressed = True
+        print(f"  {case['tasks']:>7} tasks / {case['spread']:<8} "
+              f"time x{time_ratio:.2f}  memory x{memory_ratio:.2f}{flag}", file=sys.stderr)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark study schedule generation.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="task counts to run")
+    parser.add_argument("--spreads", nargs="+", default=list(SPREADS), choices=list(SPREADS),
+                        help="due-date spreads to run")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic tasks")
+    parser.add_argument("--optimize", action="store_true",
+                        help="time planner_optimizer.optimize_schedule instead of the greedy planner")
+    parser.add_argument("-o", "--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="ratio above which a case counts as a regression (default 1.2)")
+    args = parser.parse_args(argv)
+
+    preferences = dict(DEFAULT_PREFERENCES)
+    # The optimiser has no time limit here so the solve itself is measured
+    planner = schedule_assignments
+    if args.optimize:
+        def planner(assignments, preferences, today):
+            return optimize_schedule(assignments, preferences, today=today, time_limit=float("inf"))
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "today": BENCH_TODAY.isoformat(),
+        "preferences": preferences,
+        "planner": "optimizer" if args.optimize else "greedy",
+        "cases": [],
+    }
+
+    for spread in args.spreads:
+        for size in args.sizes:
+            assignments = make_assignments(size, SPREADS[spread], seed=args.seed)
+            # Large cases take seconds each, so time them once
+            repeat = args.repeat if size <= 10000 else 1
+            case = {"tasks": size, "spread": spread}
+            case.update(run_case(assignments, preferences, repeat, planner))
+            results["cases"].append(case)
+            print(f"{size:>7} tasks / {spread:<8} {case['wall_seconds'] * 1000:10.1f} ms "
+                  f"{case['peak_memory_bytes'] / 1024:10.0f} KiB {case['sessions']:>7} sessions",
+                  file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Scheduling engine for the AI Study Planner (no GUI needed).
+
+Assignments are plain dicts ({"course", "task", "due_date", "priority",
+"hours"}) and preferences use the same keys as AIStudyPlanner.user_preferences.
+Due dates are parsed once into day numbers (date ordinals), every day from
+today to the last due date gets a study-hours capacity in a NumPy array, and
+tasks are given hours earliest deadline first (higher priority first on the
+same day) without going over `daily_study_hours` per day or `focus_hours`
+per task per day.
+
+It can also be run from the command line, e.g. for nightly batch planning:
+    python planner_core.py tasks.json --output plan.ics
+    python planner_core.py tasks.csv --daily-hours 5 --focus-hours 1.5 --timing
+    python planner_core.py tasks.json --optimize   # see planner_optimizer.py
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from planner_io import export_sessions, import_assignments, validate_assignment
+
+DATE_FORMAT = '%Y-%m-%d'
+PRIORITY_VALUES = {"High": 3, "Medium": 2, "Low": 1}
+
+# How many tasks to plan between progress reports / cancel checks
+PROGRESS_EVERY = 200
+# Leftover hours below this are float rounding, not work that did not fit
+HOURS_EPSILON = 1e-6
+
+STUDY_TIPS = [
+    "Use the Pomodoro technique: 25 min focus, 5 min break",
+    "Review material within 24 hours to improve retention by up to 60%",
+    "Study hardest subjects when you're most alert",
+    "Teach what you've learned to reinforce understanding",
+    "Take regular breaks to maintain focus and prevent burnout"
+]
+
+
+class ScheduleCancelled(Exception):
+    pass
+
+
+def parse_due_ordinal(due_date):
+    return datetime.strptime(due_date, DATE_FORMAT).toordinal()
+
+
+def _take_until(amounts, needed):
+    """Keep taking from `amounts` in order until `needed` hours are covered."""
+    before = np.cumsum(amounts) - amounts
+    return np.clip(needed - before, 0, amounts)
+
+
+def schedule_assignments(assignments, preferences, today=None, progress=None, cancel_event=None):
+    """
+    Plan study sessions for `assignments`.
+
+    `progress(done, total)` is called every few hundred tasks, and setting
+    `cancel_event` (a threading.Event) stops the run with ScheduleCancelled.
+
+    Returns a dict with:
+        sessions  every session, in planning order
+                  ({"date", "course", "task", "hours", "priority"})
+        tasks     one entry per scheduled assignment with its sessions,
+                  recommended hours per day and any hours that did not fit
+        overdue   assignments whose due date has already passed
+    """
+    today = today or date.today()
+    start = today.toordinal()
+    daily_hours = float(preferences['daily_study_hours'])
+    focus_hours = float(preferences['focus_hours'])
+
+    plan = {"sessions": [], "tasks": [], "overdue": []}
+    if not assignments:
+        return plan
+
+    # Parse every due date once
+    due = np.fromiter((parse_due_ordinal(a['due_date']) for a in assignments),
+                      dtype=np.int64, count=len(assignments))
+    priority = np.fromiter((PRIORITY_VALUES.get(a['priority'], 1) for a in assignments),
+                           dtype=np.int64, count=len(assignments))
+
+    # Earliest deadline first, higher priority first on the same deadline
+    order = np.lexsort((-priority, due))
+
+    # Study hours left on each day from today up to the last due date.
+    # Date ordinal 1 is a Monday, so (ordinal - 1) % 7 is the weekday.
+    horizon = max(int(due.max()) - start + 1, 1)
+    day_numbers = start + np.arange(horizon)
+    capacity = np.full(horizon, daily_hours)
+    capacity[(day_numbers - 1) % 7 >= 5] = 0  # Skip weekends
+
+    total = len(order)
+    for done, index in enumerate(order):
+        if done % PROGRESS_EVERY == 0:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ScheduleCancelled()
+            if progress is not None:
+                progress(done, total)
+
+        assignment = assignments[index]
+        if due[index] < start:
+            plan["overdue"].append(assignment)
+            continue
+
+        # Study on the days before the due date (or today if it is due today)
+        last_day = max(int(due[index]) - 1 - start, 0)
+        window = capacity[:last_day + 1]
+        hours_needed = float(assignment['hours'])
+        days_available = max(1, int(np.count_nonzero(window)))
+        hours_per_day = min(hours_needed / days_available, daily_hours / 2)
+
+        # First spread the work evenly, then top up from the earliest days
+        even_share = np.minimum(window, min(hours_per_day, focus_hours))
+        allocation = _take_until(even_share, hours_needed)
+        remaining = hours_needed - allocation.sum()
+        if remaining > 1e-9:
+            room = np.minimum(window - allocation, focus_hours - allocation)
+            allocation += _take_until(room, remaining)
+        window -= allocation
+
+        task_sessions = []
+        for offset in np.flatnonzero(allocation > 1e-9):
+            task_sessions.append({
+                'date': date.fromordinal(start + int(offset)).strftime(DATE_FORMAT),
+                'course': assignment['course'],
+                'task': assignment['task'],
+                'hours': float(allocation[offset]),
+                'priority': assignment['priority']
+            })
+        plan["sessions"].extend(task_sessions)
+        plan["tasks"].append({
+            "assignment": assignment,
+            "hours_per_day": hours_per_day,
+            "sessions": task_sessions,
+            "unscheduled_hours": max(round(hours_needed - float(allocation.sum()), 6), 0.0)
+        })
+
+    if progress is not None:
+        progress(total, total)
+    return plan
+
+
+def format_schedule_lines(plan):
+    """Yield the plan as lines of text (the schedule shown in the planner)."""
+    yield "AI-GENERATED STUDY SCHEDULE\n"
+    yield "=" * 50 + "\n\n"
+
+    for assignment in plan['overdue']:
+        yield f"⚠️ OVERDUE: {assignment['task']} (was due {assignment['due_date']})\n"
+
+    for task_plan in plan['tasks']:
+        assignment = task_plan['assignment']
+        yield f"\n📚 {assignment['course']}: {assignment['task']}\n"
+        yield f"   Due: {assignment['due_date']} | Priority: {assignment['priority']}\n"
+        yield f"   Recommended: {task_plan['hours_per_day']:.1f} hours per day\n"
+
+        for session in task_plan['sessions']:
+            session_date = date.fromisoformat(session['date'])
+            slot = f" ({session['time_slot']})" if session.get('time_slot') else ""
+            yield f"   • {session_date.strftime('%A, %b %d')}{slot}: {session['hours']:.1f} hours\n"
+
+        if task_plan['unscheduled_hours'] > HOURS_EPSILON:
+            yield f"   ⚠️ {task_plan['unscheduled_hours']:.1f} hours do not fit before the due date\n"
+
+    # Add study tips
+    yield "\n" + "=" * 50 + "\n"
+    yield "📝 AI STUDY TIPS:\n"
+    for tip in STUDY_TIPS:
+        yield f"• {tip}\n"
+
+
+def compute_stats(assignments, preferences):
+    """Task counts and hours for the statistics panel, in one pass."""
+    stats = {
+        "total_tasks": 0,
+        "total_hours": 0,
+        "by_priority": {"High": 0, "Medium": 0, "Low": 0},
+        "daily_study_hours": preferences['daily_study_hours'],
+    }
+    for assignment in assignments:
+        stats["total_tasks"] += 1
+        stats["total_hours"] += assignment['hours']
+        if assignment['priority'] in stats["by_priority"]:
+            stats["by_priority"][assignment['priority']] += 1
+    return stats
+
+
+def format_stats(stats):
+    return f"""
+        Study Statistics:
+        • Total tasks: {stats['total_tasks']}
+        • Total study hours needed: {stats['total_hours']}
+        • High priority tasks: {stats['by_priority']['High']}
+        • Medium priority tasks: {stats['by_priority']['Medium']}
+        • Low priority tasks: {stats['by_priority']['Low']}
+        • Recommended daily study: {stats['daily_study_hours']} hours
+        """
+
+
+DEFAULT_PREFERENCES = {
+    'focus_hours': 2,
+    'break_minutes': 15,
+    'daily_study_hours': 4,
+    'preferred_times': ['Morning', 'Afternoon', 'Evening']
+}
+
+
+def load_task_file(path):
+    """
+    Read (assignments, preferences, courses) from a task file.
+
+    JSON files hold either a list of assignments or {"assignments": [...],
+    "preferences": {...}, "courses": [...]}; .csv and .ics files are read
+    with planner_io. Invalid records are reported on stderr and skipped.
+    """
+    preferences = dict(DEFAULT_PREFERENCES)
+    courses = []
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            preferences.update(data.get("preferences", {}))
+            courses = data.get("courses", [])
+            data = data.get("assignments", [])
+        assignments = []
+        for number, raw in enumerate(data, 1):
+            assignment, error = validate_assignment(raw)
+            if error:
+                print(f"Skipping task {number}: {error}", file=sys.stderr)
+            else:
+                assignments.append(assignment)
+    else:
+        assignments, errors = import_assignments(path)
+        for line, error in errors:
+            print(f"Skipping line {line}: {error}", file=sys.stderr)
+    return assignments, preferences, courses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan study sessions without the GUI.")
+    parser.add_argument("tasks", help="task file (.json, .csv or .ics)")
+    parser.add_argument("-o", "--output",
+                        help="write the plan here (.txt, .json, .csv or .ics); prints it if omitted")
+    parser.add_argument("--daily-hours", type=float, help="study hours per day")
+    parser.add_argument("--focus-hours", type=float, help="longest session per task per day")
+    parser.add_argument("--today", help="plan as if today were YYYY-MM-DD")
+    parser.add_argument("--optimize", action="store_true",
+                        help="use the optimiser (needs SciPy; falls back to greedy planning)")
+    parser.add_argument("--time-limit", type=float, help="seconds the optimiser may take")
+    parser.add_argument("--timing", action="store_true", help="print how long planning took")
+    args = parser.parse_args(argv)
+
+    assignments, preferences, courses = load_task_file(args.tasks)
+    if args.daily_hours is not None:
+        preferences['daily_study_hours'] = args.daily_hours
+    if args.focus_hours is not None:
+        preferences['focus_hours'] = args.focus_hours
+    today = datetime.strptime(args.today, DATE_FORMAT).date() if args.today else None
+
+    if args.optimize:
+        # Imported here because planner_optimizer builds on this module
+        from planner_optimizer import OPTIMIZER_TIME_LIMIT, optimize_schedule
+
+    started = time.perf_counter()
+    if args.optimize:
+        time_limit = args.time_limit if args.time_limit is not None else OPTIMIZER_TIME_LIMIT
+        plan = optimize_schedule(assignments, preferences, courses, today=today, time_limit=time_limit)
+        if plan['note']:
+            print(f"Optimiser not used ({plan['note']}); planned greedily", file=sys.stderr)
+    else:
+        plan = schedule_assignments(assignments, preferences, today=today)
+    elapsed = time.perf_counter() - started
+
+    output = args.output or ""
+    if output.lower().endswith((".csv", ".ics")):
+        export_sessions(plan['sessions'], output)
+    elif output.lower().endswith(".json"):
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({
+                "sessions": plan['sessions'],
+                "overdue": plan['overdue'],
+                "unscheduled": [
+                    {"task": t['assignment']['task'], "course": t['assignment']['course'],
+                     "hours": t['unscheduled_hours']}
+                    for t in plan['tasks'] if t['unscheduled_hours'] > HOURS_EPSILON
+                ],
+                "stats": compute_stats(assignments, preferences),
+            }, f, ensure_ascii=False, indent=2)
+    elif output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.writelines(format_schedule_lines(plan))
+            f.write(format_stats(compute_stats(assignments, preferences)))
+    else:
+        sys.stdout.writelines(format_schedule_lines(plan))
+        sys.stdout.write(format_stats(compute_stats(assignments, preferences)))
+
+    if args.timing:
+        print(f"Planned {len(assignments)} tasks into {len(plan['sessions'])} sessions "
+              f"in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+CSV and iCalendar (.ics) import/export for the AI Study Planner.
+
+Imports read the file one row/event at a time and check every assignment in
+the same pass (due dates are parsed once and stored as YYYY-MM-DD). Exports
+write study sessions row by row, so a very large schedule never has to be
+built as one big string.
+"""
+
+import csv
+import os
+import re
+from datetime import date, datetime, timezone
+
+DATE_FORMAT = '%Y-%m-%d'
+PRIORITIES = ("Low", "Medium", "High")
+CSV_FIELDS = ("course", "task", "due_date", "priority", "hours")
+SESSION_FIELDS = ("date", "course", "task", "hours", "priority")
+
+_DURATION_PATTERN = re.compile(r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$")
+
+
+def parse_date(value):
+    """Accept YYYY-MM-DD, YYYY/MM/DD or iCalendar YYYYMMDD[THHMMSS[Z]]."""
+    value = value.strip()
+    for fmt in (DATE_FORMAT, '%Y/%m/%d'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    return datetime.strptime(value[:8], '%Y%m%d').date()
+
+
+def validate_assignment(raw):
+    """Return (assignment, None) or (None, error message) for one raw record."""
+    course = (raw.get("course") or "").strip()
+    task = (raw.get("task") or "").strip()
+    if not course or not task:
+        return None, "course and task are required"
+
+    try:
+        due_date = parse_date(raw.get("due_date") or "").strftime(DATE_FORMAT)
+    except ValueError:
+        return None, f"invalid due date {raw.get('due_date')!r}"
+
+    priority = (raw.get("priority") or "Medium").strip().capitalize()
+    if priority not in PRIORITIES:
+        return None, f"invalid priority {raw.get('priority')!r}"
+
+    try:
+        hours = float(raw.get("hours") or 1)
+        if hours <= 0:
+            raise ValueError
+    except ValueError:
+        return None, f"invalid hours {raw.get('hours')!r}"
+
+    return {"course": course, "task": task, "due_date": due_date,
+            "priority": priority, "hours": hours}, None
+
+
+def iter_csv_records(path):
+    """Yield (line number, raw record) from a CSV file with a header row."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        # Accept headers like "Due Date" or "Est. Hours"
+        aliases = {"duedate": "due_date", "due": "due_date", "esthours": "hours", "name": "task"}
+        fieldnames = []
+        for name in reader.fieldnames or []:
+            key = re.sub(r"[^a-z]", "", (name or "").lower())
+            fieldnames.append(aliases.get(key, key if key in CSV_FIELDS else name))
+        reader.fieldnames = fieldnames
+        for record in reader:
+            yield reader.line_num, record
+
+
+def _ics_priority(value):
+    # RFC 5545: 1-4 high, 5 medium, 6-9 low, 0 undefined
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return "Medium"
+    if 1 <= number <= 4:
+        return "High"
+    if number >= 6:
+        return "Low"
+    return "Medium"
+
+
+def _ics_hours(duration):
+    match = _DURATION_PATTERN.match(duration.strip()) if duration else None
+    if not match:
+        return None
+    days, hours, minutes = (int(part or 0) for part in match.groups())
+    return days * 24 + hours + minutes / 60 or None
+
+
+def _unescape_ics(value):
+    return (value.replace("\\n", "\n").replace("\\N", "\n")
+            .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def _ics_due_date(record):
+    if record.get("DUE"):
+        return record["DUE"]
+    end = record.get("DTEND")
+    if not end:
+        return record.get("DTSTART", "")
+    if "T" in end:
+        return end
+    # An all-day DTEND is exclusive (the day after the event), so step back a day
+    try:
+        day = parse_date(end).toordinal() - 1
+        if record.get("DTSTART"):
+            day = max(day, parse_date(record["DTSTART"]).toordinal())
+    except ValueError:
+        return end
+    return date.fromordinal(day).strftime(DATE_FORMAT)
+
+
+def _iter_ics_lines(f):
+    # Undo line folding: a line starting with a space/tab continues the last one
+    current, current_line = None, 0
+    for line_number, line in enumerate(f, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current_line, current
+        current, current_line = line, line_number
+    if current is not None:
+        yield current_line, current
+
+
+def iter_ics_records(path):
+    """Yield (line number, raw record) for every VTODO/VEVENT in an .ics file."""
+    with open(path, encoding="utf-8-sig") as f:
+        record, start_line = None, 0
+        for line_number, line in _iter_ics_lines(f):
+            if line in ("BEGIN:VTODO", "BEGIN:VEVENT"):
+                record, start_line = {}, line_number
+                continue
+            if line in ("END:VTODO", "END:VEVENT") and record is not None:
+                # First category is the course (split before unescaping "\,")
+                category = re.split(r"(?<!\\),", record.get("CATEGORIES", ""))[0]
+                yield start_line, {
+                    "course": _unescape_ics(category) or _unescape_ics(record.get("LOCATION", "Imported")),
+                    "task": _unescape_ics(record.get("SUMMARY", "")),
+                    "due_date": _ics_due_date(record),
+                    "priority": _ics_priority(record.get("PRIORITY")),
+                    "hours": record.get("X-ESTIMATED-HOURS") or _ics_hours(record.get("DURATION")) or 1,
+                }
+                record = None
+                continue
+            if record is None or ":" not in line:
+                continue
+            name, value = line.split(":", 1)
+            name = name.split(";", 1)[0].upper()
+            record.setdefault(name, value)
+
+
+def import_assignments(path):
+    """
+    Read assignments from a .csv or .ics file in one pass.
+
+    Returns (assignments, errors) where errors is a list of
+    (line number, message) for records that were skipped.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    records = iter_ics_records(path) if extension in (".ics", ".ical") else iter_csv_records(path)
+    assignments, errors = [], []
+    for line_number, raw in records:
+        assignment, error = validate_assignment(raw)
+        if error:
+            errors.append((line_number, error))
+        else:
+            assignments.append(assignment)
+    return assignments, errors
+
+
+def write_sessions_csv(sessions, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SESSION_FIELDS)
+        for session in sessions:
+            writer.writerow([session[field] for field in SESSION_FIELDS])
+
+
+def _escape_ics(value):
+    return (str(value).replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _fold_ics(line):
+    # Lines longer than 75 octets (UTF-8) continue on the next line after a
+    # space; a fold never splits a multibyte character
+    data = line.encode("utf-8")
+    parts, start, limit = [], 0, 75
+    while len(data) - start > limit:
+        end = start + limit
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start, limit = end, 74
+    parts.append(data[start:].decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def write_sessions_ics(sessions, path):
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//AI Study Planner//EN\r\n")
+        for number, session in enumerate(sessions, 1):
+            day = parse_date(session['date'])
+            f.write("BEGIN:VEVENT\r\n")
+            f.write(f"UID:session-{number}-{day:%Y%m%d}@ai-study-planner\r\n")
+            f.write(f"DTSTAMP:{stamp}\r\n")
+            f.write(f"DTSTART;VALUE=DATE:{day:%Y%m%d}\r\n")
+            f.write(f"DTEND;VALUE=DATE:{date.fromordinal(day.toordinal() + 1):%Y%m%d}\r\n")
+            f.write(_fold_ics(f"SUMMARY:{_escape_ics(session['course'])}: "
+                              f"{_escape_ics(session['task'])} ({session['hours']:.1f}h)"))
+            f.write(_fold_ics(f"CATEGORIES:{_escape_ics(session['course'])}"))
+            f.write(f"X-ESTIMATED-HOURS:{session['hours']:.2f}\r\n")
+            f.write("END:VEVENT\r\n")
+        f.write("END:VCALENDAR\r\n")
+
+
+def export_sessions(sessions, path):
+    """Write sessions as .ics or .csv, chosen by the file extension."""
+    if os.path.splitext(path)[1].lower() in (".ics", ".ical"):
+        write_sessions_ics(sessions, path)
+    else:
+        write_sessions_csv(sessions, path)
@@ -0,0 +1,212 @@
+"""
+Optimiser mode for the AI Study Planner.
+
+Instead of splitting each task evenly, study hours are placed by a linear
+program over (task, day, time slot). Every weekday before a task's due date
+has a Morning, Afternoon and Evening slot; the constraints are the same
+limits the greedy planner uses (`daily_study_hours` per day, `focus_hours`
+per task per day and per slot) and the cost prefers:
+    * the slots listed in `preferred_times`,
+    * earlier slots and earlier days for difficult courses,
+    * leaving hours unscheduled only on low priority tasks.
+
+The LP is solved with SciPy's HiGHS solver under a time limit. If SciPy is
+not installed, the solver runs out of time or fails, the plan comes from
+planner_core.schedule_assignments instead; plan["mode"] says which one ran.
+"""
+
+import time
+from datetime import date
+
+import numpy as np
+
+from planner_core import (DATE_FORMAT, PRIORITY_VALUES, ScheduleCancelled,
+                          parse_due_ordinal, schedule_assignments)
+
+try:
+    from scipy.optimize import linprog
+    from scipy.sparse import coo_matrix
+except ImportError:  # Optimiser mode needs SciPy; greedy planning does not
+    linprog = None
+
+TIME_SLOTS = ("Morning", "Afternoon", "Evening")
+# Seconds the optimiser may take before falling back to greedy planning
+OPTIMIZER_TIME_LIMIT = 0.8
+DEFAULT_DIFFICULTY = 3
+
+# Cost per hour (only their relative sizes matter)
+NON_PREFERRED_SLOT_COST = 1.0
+LATE_SLOT_COST = 0.1        # per slot after Morning, times difficulty / 5
+DAY_COST = 0.01             # per day from today, times (1 + difficulty / 5)
+UNSCHEDULED_COST = 1000.0   # per hour left out, times the priority value
+
+
+def course_difficulties(courses):
+    """Map course name -> difficulty (1-5) from the planner's course list."""
+    return {c['name']: c.get('difficulty') or DEFAULT_DIFFICULTY for c in courses or []}
+
+
+def _greedy(assignments, preferences, today, progress, cancel_event, note):
+    plan = schedule_assignments(assignments, preferences, today=today,
+                                progress=progress, cancel_event=cancel_event)
+    plan["mode"] = "greedy"
+    plan["note"] = note
+    return plan
+
+
+def optimize_schedule(assignments, preferences, courses=None, today=None,
+                      time_limit=OPTIMIZER_TIME_LIMIT, progress=None, cancel_event=None):
+    """
+    Plan study sessions with the optimiser; same arguments and result as
+    schedule_assignments plus `courses` (for difficulty) and `time_limit`.
+
+    Sessions also carry a "time_slot", and the plan has "mode" ("optimizer"
+    or "greedy") and "note" (why it fell back to greedy, if it did).
+    """
+    started = time.perf_counter()
+    today = today or date.today()
+    if linprog is None:
+        return _greedy(assignments, preferences, today, progress, cancel_event,
+                       "SciPy is not installed")
+
+    start = today.toordinal()
+    daily_hours = float(preferences['daily_study_hours'])
+    focus_hours = float(preferences['focus_hours'])
+    preferred = set(preferences.get('preferred_times') or TIME_SLOTS)
+    difficulty_by_course = course_difficulties(courses)
+
+    plan = {"sessions": [], "tasks": [], "overdue": [], "mode": "optimizer", "note": ""}
+    if not assignments:
+        return plan
+    total = len(assignments)
+    if progress is not None:
+        progress(0, total)
+
+    due = np.fromiter((parse_due_ordinal(a['due_date']) for a in assignments),
+                      dtype=np.int64, count=total)
+    priority = np.fromiter((PRIORITY_VALUES.get(a['priority'], 1) for a in assignments),
+                           dtype=np.int64, count=total)
+    order = np.lexsort((-priority, due))
+    plan["overdue"] = [assignments[i] for i in order if due[i] < start]
+    order = order[due[order] >= start]
+    if len(order) == 0:
+        return plan
+
+    # Weekdays (as offsets from today) up to the last due date
+    horizon = max(int(due.max()) - start + 1, 1)
+    weekdays = np.flatnonzero((start + np.arange(horizon) - 1) % 7 < 5)
+    day_count = len(weekdays)
+    slot_count = len(TIME_SLOTS)
+    task_count = len(order)
+
+    # One (task, day) arc per weekday before each due date (or today if due today)
+    last_day = np.maximum(due[order] - 1 - start, 0)
+    days_per_task = np.searchsorted(weekdays, last_day, side='right')
+    arc_count = int(days_per_task.sum())
+    arc_task = np.repeat(np.arange(task_count), days_per_task)
+    first_arc = np.cumsum(days_per_task) - days_per_task
+    arc_day = np.arange(arc_count) - np.repeat(first_arc, days_per_task)  # index into weekdays
+
+    difficulty = np.array([difficulty_by_course.get(assignments[i]['course'], DEFAULT_DIFFICULTY)
+                           for i in order], dtype=float)
+    slot_penalty = np.array([0.0 if slot in preferred else NON_PREFERRED_SLOT_COST
+                             for slot in TIME_SLOTS])
+
+    # Variables: task -> day arcs, day -> slot arcs, then unscheduled hours per task
+    slot_var_count = day_count * slot_count
+    cost = np.concatenate([
+        DAY_COST * weekdays[arc_day] * (1 + difficulty[arc_task] / 5),
+        np.tile(slot_penalty + LATE_SLOT_COST * np.arange(slot_count) / 5, day_count),
+        UNSCHEDULED_COST * priority[order],
+    ])
+    upper = np.concatenate([
+        np.full(arc_count, focus_hours),
+        np.full(slot_var_count, min(focus_hours, daily_hours)),
+        np.full(task_count, np.inf),
+    ])
+
+    # Flow balance: a task's hours are scheduled or left over, and the hours
+    # on a day are exactly the hours given to that day's slots
+    arcs = np.arange(arc_count)
+    slot_vars = arc_count + np.arange(slot_var_count)
+    a_eq = coo_matrix((
+        np.concatenate([np.ones(arc_count), np.ones(task_count),
+                        np.ones(arc_count), -np.ones(slot_var_count)]),
+        (np.concatenate([arc_task, np.arange(task_count),
+                         task_count + arc_day, task_count + np.repeat(np.arange(day_count), slot_count)]),
+         np.concatenate([arcs, arc_count + slot_var_count + np.arange(task_count),
+                         arcs, slot_vars])),
+    ), shape=(task_count + day_count, arc_count + slot_var_count + task_count)).tocsr()
+    b_eq = np.concatenate([[float(assignments[i]['hours']) for i in order], np.zeros(day_count)])
+
+    # At most daily_study_hours across a day's slots
+    a_ub = coo_matrix((
+        np.ones(slot_var_count),
+        (np.repeat(np.arange(day_count), slot_count), slot_vars),
+    ), shape=(day_count, a_eq.shape[1])).tocsr()
+    b_ub = np.full(day_count, daily_hours)
+
+    if cancel_event is not None and cancel_event.is_set():
+        raise ScheduleCancelled()
+    remaining = time_limit - (time.perf_counter() - started)
+    if remaining <= 0:
+        return _greedy(assignments, preferences, today, progress, cancel_event,
+                       "optimiser ran out of time")
+    result = linprog(cost, A_ub=a_ub, b_ub=b_ub, A_eq=a_eq, b_eq=b_eq,
+                     bounds=np.column_stack([np.zeros_like(upper), upper]),
+                     method='highs', options={"time_limit": remaining})
+    if cancel_event is not None and cancel_event.is_set():
+        raise ScheduleCancelled()
+    if result.status != 0:
+        reason = "optimiser ran out of time" if result.status == 1 else result.message
+        return _greedy(assignments, preferences, today, progress, cancel_event, reason)
+
+    arc_hours = np.round(result.x[:arc_count], 2)
+    slot_hours = result.x[arc_count:arc_count + slot_var_count].reshape(day_count, slot_count)
+    unscheduled = np.round(result.x[arc_count + slot_var_count:], 2)
+
+    # Fill each day's slots in order, hardest courses first
+    task_sessions = [[] for _ in range(task_count)]
+    used = np.flatnonzero(arc_hours > 0)
+    used = used[np.lexsort((arc_task[used], -difficulty[arc_task[used]], arc_day[used]))]
+    current_day, slot, room = None, 0, 0.0
+    for arc in used:
+        day = int(arc_day[arc])
+        if day != current_day:
+            current_day, slot, room = day, 0, float(slot_hours[day, 0])
+            session_date = date.fromordinal(start + int(weekdays[day])).strftime(DATE_FORMAT)
+        task = int(arc_task[arc])
+        assignment = assignments[order[task]]
+        hours_left = float(arc_hours[arc])
+        while hours_left > 0.005:
+            while room <= 0.005 and slot < slot_count - 1:
+                slot += 1
+                room = float(slot_hours[day, slot])
+            # Rounding can leave a few minutes over; they go in the last slot
+            hours = hours_left if slot == slot_count - 1 else min(hours_left, room)
+            task_sessions[task].append({
+                'date': session_date,
+                'time_slot': TIME_SLOTS[slot],
+                'course': assignment['course'],
+                'task': assignment['task'],
+                'hours': round(hours, 2),
+                'priority': assignment['priority']
+            })
+            hours_left -= hours
+            room -= hours
+
+    for task, index in enumerate(order):
+        assignment = assignments[index]
+        sessions = task_sessions[task]
+        study_days = len({s['date'] for s in sessions})
+        plan["sessions"].extend(sessions)
+        plan["tasks"].append({
+            "assignment": assignment,
+            "hours_per_day": sum(s['hours'] for s in sessions) / max(study_days, 1),
+            "sessions": sessions,
+            "unscheduled_hours": max(float(unscheduled[task]), 0.0)
+        })
+
+    if progress is not None:
+        progress(total, total)
+    return plan
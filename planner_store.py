@@ -0,0 +1,159 @@
+"""
+SQLite storage for the AI Study Planner.
+
+Courses, assignments and study sessions are kept as the same dicts the GUI
+already uses. Writes are queued and saved together in one transaction when
+flush() is called, and assignments are read back page by page so opening a
+planner with years of history does not load everything at once.
+"""
+
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    name TEXT PRIMARY KEY,
+    code TEXT,
+    difficulty INTEGER
+);
+CREATE TABLE IF NOT EXISTS assignments (
+    id INTEGER PRIMARY KEY,
+    course TEXT NOT NULL,
+    task TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    hours REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assignments_due_date ON assignments(due_date);
+CREATE INDEX IF NOT EXISTS idx_assignments_course ON assignments(course);
+CREATE TABLE IF NOT EXISTS study_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    course TEXT NOT NULL,
+    task TEXT NOT NULL,
+    hours REAL NOT NULL,
+    priority TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON study_sessions(date);
+CREATE INDEX IF NOT EXISTS idx_sessions_course ON study_sessions(course);
+"""
+
+ASSIGNMENT_COLUMNS = ("id", "course", "task", "due_date", "priority", "hours")
+SESSION_COLUMNS = ("date", "course", "task", "hours", "priority")
+
+
+class PlannerStore:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        # Writes waiting for the next flush()
+        self._upserts = {}
+        self._deletes = set()
+        self._courses = None
+        self._sessions = None
+
+    def is_empty(self):
+        """True for a brand new database (nothing has ever been saved)."""
+        row = self.conn.execute(
+            "SELECT EXISTS(SELECT 1 FROM assignments) OR EXISTS(SELECT 1 FROM courses)"
+        ).fetchone()
+        return not row[0]
+
+    def count_assignments(self):
+        return self.conn.execute("SELECT COUNT(*) FROM assignments").fetchone()[0]
+
+    def max_assignment_id(self):
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM assignments").fetchone()[0]
+
+    def load_courses(self):
+        rows = self.conn.execute("SELECT name, code, difficulty FROM courses ORDER BY rowid")
+        return [{"name": name, "code": code, "difficulty": difficulty} for name, code, difficulty in rows]
+
+    def iter_assignment_pages(self, page_size=500, max_id=None):
+        """
+        Yield assignments in id order, one list of up to `page_size` at a time.
+
+        With `max_id`, rows added after paging started (higher ids) are left
+        out, since the caller already has them.
+        """
+        if max_id is None:
+            max_id = self.max_assignment_id()
+        last_id = 0
+        while True:
+            rows = self.conn.execute(
+                "SELECT id, course, task, due_date, priority, hours FROM assignments"
+                " WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                (last_id, max_id, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            yield [dict(zip(ASSIGNMENT_COLUMNS, row)) for row in rows]
+            last_id = rows[-1][0]
+
+    def load_sessions(self):
+        rows = self.conn.execute(
+            "SELECT date, course, task, hours, priority FROM study_sessions ORDER BY id"
+        )
+        return [dict(zip(SESSION_COLUMNS, row)) for row in rows]
+
+    # Queued writes -----------------------------------------------------
+
+    def save_assignment(self, assignment):
+        self._deletes.discard(assignment['id'])
+        self._upserts[assignment['id']] = assignment
+
+    def save_assignments(self, assignments):
+        for assignment in assignments:
+            self.save_assignment(assignment)
+
+    def delete_assignments(self, assignment_ids):
+        for assignment_id in assignment_ids:
+            self._upserts.pop(assignment_id, None)
+            self._deletes.add(assignment_id)
+
+    def save_courses(self, courses):
+        self._courses = list(courses)
+
+    def replace_sessions(self, sessions):
+        self._sessions = sessions
+
+    def has_pending_writes(self):
+        return bool(self._upserts or self._deletes or self._courses is not None or self._sessions is not None)
+
+    def flush(self):
+        """Write all queued changes in a single transaction."""
+        if not self.has_pending_writes():
+            return
+        with self.conn:
+            if self._deletes:
+                self.conn.executemany("DELETE FROM assignments WHERE id = ?",
+                                      [(assignment_id,) for assignment_id in self._deletes])
+            if self._upserts:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO assignments (id, course, task, due_date, priority, hours)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [tuple(a[column] for column in ASSIGNMENT_COLUMNS) for a in self._upserts.values()],
+                )
+            if self._courses is not None:
+                self.conn.execute("DELETE FROM courses")
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO courses (name, code, difficulty) VALUES (?, ?, ?)",
+                    [(c['name'], c.get('code'), c.get('difficulty')) for c in self._courses],
+                )
+            if self._sessions is not None:
+                self.conn.execute("DELETE FROM study_sessions")
+                self.conn.executemany(
+                    "INSERT INTO study_sessions (date, course, task, hours, priority) VALUES (?, ?, ?, ?, ?)",
+                    [tuple(s[column] for column in SESSION_COLUMNS) for s in self._sessions],
+                )
+        self._upserts = {}
+        self._deletes = set()
+        self._courses = None
+        self._sessions = None
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,130 @@
+"""
+Question bank for the maths quiz.
+
+Questions are generated in batches with NumPy (all operands of a batch are
+drawn at once), stored as small integer arrays in a ring buffer, and handed
+out one at a time. When the buffer runs low a background thread tops it up.
+Giving the same seed to every student produces the same question sequence.
+"""
+
+import threading
+
+import numpy as np
+
+DIFFICULTY_INDEX = {"Easy 🟢": 0, "Medium 🟡": 1, "Hard 🔴": 2}
+# Largest operand for addition/subtraction, per difficulty
+MAX_NUMBER = np.array([20, 100, 1000])
+# Largest factor for multiplication/division, per difficulty
+MAX_FACTOR = np.array([10, 20, 50])
+
+OPERATIONS = ["Addition", "Subtraction", "Multiplication", "Division"]
+OPERATION_INDEX = {
+    "Addition ➕": 0,
+    "Subtraction ➖": 1,
+    "Multiplication ✖️": 2,
+    "Division ➗": 3,
+    "All Operations": None,
+}
+SIGNS = ["+", "-", "×", "÷"]
+SYMBOLS = ["➕", "➖", "✖️", "➗"]
+
+
+def generate_batch(rng, difficulty_index, operation_index, size):
+    """Return (ops, num1, num2, answers) arrays for `size` questions."""
+    max_num = MAX_NUMBER[difficulty_index]
+    max_factor = MAX_FACTOR[difficulty_index]
+
+    if operation_index is None:
+        ops = rng.integers(0, 4, size, dtype=np.int8)
+    else:
+        ops = np.full(size, operation_index, dtype=np.int8)
+
+    # Draw every kind of operand once for the whole batch, then pick per op
+    big_a = rng.integers(1, max_num + 1, size)
+    big_b = rng.integers(1, max_num + 1, size)
+    factor_a = rng.integers(1, max_factor + 1, size)
+    factor_b = rng.integers(1, max_factor + 1, size)
+    divisor = rng.integers(2, max_factor + 1, size)
+
+    # Subtraction: second number between 1 and the first (positive result)
+    sub_b = (rng.random(size) * big_a).astype(np.int64) + 1
+
+    is_add, is_sub, is_mul = ops == 0, ops == 1, ops == 2
+    num1 = np.select([is_add | is_sub, is_mul], [big_a, factor_a], divisor * factor_a)
+    num2 = np.select([is_add, is_sub, is_mul], [big_b, sub_b, factor_b], divisor)
+    answers = np.select(
+        [is_add, is_sub, is_mul],
+        [num1 + num2, num1 - num2, num1 * num2],
+        factor_a,  # exact division: (divisor * factor_a) ÷ divisor
+    )
+    return ops, num1.astype(np.int32), num2.astype(np.int32), answers.astype(np.int32)
+
+
+class QuestionBank:
+    def __init__(self, difficulty, operation, seed=None, batch_size=256, low_water=64):
+        self.difficulty_index = DIFFICULTY_INDEX[difficulty]
+        self.operation_index = OPERATION_INDEX[operation]
+        self.batch_size = batch_size
+        self.low_water = min(low_water, batch_size)
+        self.rng = np.random.default_rng(seed)
+
+        capacity = batch_size * 2
+        self._ops = np.zeros(capacity, dtype=np.int8)
+        self._num1 = np.zeros(capacity, dtype=np.int32)
+        self._num2 = np.zeros(capacity, dtype=np.int32)
+        self._answers = np.zeros(capacity, dtype=np.int32)
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._refilling = False
+
+        self._refill()
+
+    def __len__(self):
+        return self._count
+
+    def next_question(self):
+        with self._lock:
+            if self._count == 0:
+                self._fill_locked()
+            i = self._head
+            op = int(self._ops[i])
+            num1, num2, answer = int(self._num1[i]), int(self._num2[i]), int(self._answers[i])
+            self._head = (self._head + 1) % len(self._ops)
+            self._count -= 1
+            start_refill = self._count < self.low_water and not self._refilling
+            if start_refill:
+                self._refilling = True
+
+        if start_refill:
+            threading.Thread(target=self._refill, daemon=True).start()
+
+        return {
+            "question": f"{num1} {SIGNS[op]} {num2} = ?",
+            "answer": answer,
+            "symbol": SYMBOLS[op],
+            "operation": OPERATIONS[op],
+        }
+
+    def _refill(self):
+        with self._lock:
+            self._fill_locked()
+            self._refilling = False
+
+    def _fill_locked(self):
+        # Batches are drawn one after another from the same generator and are
+        # always full-sized, so a seeded bank gives the same sequence no
+        # matter when the background refill happened to run.
+        capacity = len(self._ops)
+        size = self.batch_size
+        if capacity - self._count < size:
+            return
+        ops, num1, num2, answers = generate_batch(
+            self.rng, self.difficulty_index, self.operation_index, size
+        )
+        positions = (self._head + self._count + np.arange(size)) % capacity
+        self._ops[positions] = ops
+        self._num1[positions] = num1
+        self._num2[positions] = num2
+        self._answers[positions] = answers
+        self._count += size
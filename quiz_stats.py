@@ -0,0 +1,184 @@
+"""
+Quiz statistics that stay cheap during long practice sessions.
+
+RunningStats keeps count, sum, min/max and variance (Welford's method) of the
+answer times, plus a per-operation breakdown, updated in O(1) per answer.
+HistoryRing keeps only the most recent answers in a fixed-size buffer; older
+entries can be spilled to a CSV file so the full history can still be exported.
+Spill files live in the quiz's own folder under the temp directory, are capped
+in size (the oldest half is dropped when one grows past the cap) and are
+deleted on clear() or once the ring itself is garbage collected.
+"""
+
+import csv
+import io
+import math
+import os
+import shutil
+import tempfile
+import time
+import weakref
+
+HISTORY_FIELDS = ["question", "operation", "user_answer", "correct_answer", "correct", "seconds"]
+SPILL_DIR = os.path.join(tempfile.gettempdir(), "math_quiz_history")
+# About 20,000 answers per session
+MAX_SPILL_BYTES = 1024 * 1024
+# Spill files older than this were left behind by a crash and are removed
+SPILL_MAX_AGE_SECONDS = 24 * 3600
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.correct = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        # operation -> {"count", "correct", "total"}
+        self.by_operation = {}
+
+    def add(self, seconds, correct, operation=None):
+        self.count += 1
+        self.correct += int(correct)
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        delta = seconds - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (seconds - self._mean)
+
+        if operation is not None:
+            op_stats = self.by_operation.setdefault(operation, {"count": 0, "correct": 0, "total": 0.0})
+            op_stats["count"] += 1
+            op_stats["correct"] += int(correct)
+            op_stats["total"] += seconds
+
+    @property
+    def mean(self):
+        return self._mean if self.count else 0.0
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+
+class HistoryRing:
+    def __init__(self, capacity=50, spill_to_disk=False, spill_dir=SPILL_DIR, max_spill_bytes=MAX_SPILL_BYTES):
+        self.capacity = capacity
+        self.spill_to_disk = spill_to_disk
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.spill_path = None
+        self.spilled = 0
+        self.dropped = 0  # Spilled entries removed to stay under the cap
+        self._remove_spill = None
+        self._items = [None] * capacity
+        self._head = 0  # index of the next write
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, item):
+        if self._size == self.capacity:
+            # The oldest entry is about to be overwritten
+            if self.spill_to_disk:
+                self._spill(self._items[self._head])
+        else:
+            self._size += 1
+        self._items[self._head] = item
+        self._head = (self._head + 1) % self.capacity
+
+    def recent(self, n=None):
+        """Yield up to `n` entries, newest first."""
+        n = self._size if n is None else min(n, self._size)
+        for i in range(1, n + 1):
+            yield self._items[(self._head - i) % self.capacity]
+
+    def iter_all(self):
+        """Yield every entry oldest first, including those spilled to disk."""
+        if self.spill_path and os.path.exists(self.spill_path):
+            with open(self.spill_path, newline="", encoding="utf-8") as f:
+                yield from csv.DictReader(f)
+        start = (self._head - self._size) % self.capacity
+        for i in range(self._size):
+            yield self._items[(start + i) % self.capacity]
+
+    def write_csv(self, f):
+        """Write the full history to text file `f`, copying the spill file as it is."""
+        if self.spill_path and os.path.exists(self.spill_path):
+            with open(self.spill_path, newline="", encoding="utf-8") as spill:
+                shutil.copyfileobj(spill, f)
+        else:
+            csv.DictWriter(f, fieldnames=HISTORY_FIELDS).writeheader()
+        writer = csv.DictWriter(f, fieldnames=HISTORY_FIELDS, extrasaction="ignore")
+        start = (self._head - self._size) % self.capacity
+        for i in range(self._size):
+            writer.writerow(self._items[(start + i) % self.capacity])
+
+    def export_csv(self):
+        buffer = io.StringIO(newline="")
+        self.write_csv(buffer)
+        return buffer.getvalue()
+
+    def clear(self):
+        if self._remove_spill is not None:
+            self._remove_spill()
+        self._remove_spill = None
+        self.spill_path = None
+        self.spilled = 0
+        self.dropped = 0
+        self._items = [None] * self.capacity
+        self._head = 0
+        self._size = 0
+
+    def _spill(self, item):
+        new_file = self.spill_path is None
+        if new_file:
+            self.spill_path = self._new_spill_file()
+            self._remove_spill = weakref.finalize(self, _remove_file, self.spill_path)
+        with open(self.spill_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=HISTORY_FIELDS, extrasaction="ignore")
+            if new_file:
+                writer.writeheader()
+            writer.writerow(item)
+            size = f.tell()
+        self.spilled += 1
+        if size > self.max_spill_bytes:
+            self._trim_spill()
+
+    def _new_spill_file(self):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        cutoff = time.time() - SPILL_MAX_AGE_SECONDS
+        for entry in os.scandir(self.spill_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                _remove_file(entry.path)
+        fd, path = tempfile.mkstemp(prefix="quiz_history_", suffix=".csv", dir=self.spill_dir)
+        os.close(fd)
+        return path
+
+    def _trim_spill(self):
+        # Keep the newer half of the spilled rows
+        with open(self.spill_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        keep = rows[len(rows) // 2:]
+        trimmed = self.spill_path + ".tmp"
+        with open(trimmed, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=HISTORY_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(keep)
+        os.replace(trimmed, self.spill_path)
+        self.dropped += len(rows) - len(keep)
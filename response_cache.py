@@ -0,0 +1,130 @@
+"""
+Content-addressed cache for LLM responses.
+
+The key is a hash of (model, messages, extra_body), so asking exactly the same
+thing twice gives back the stored answer instead of calling the provider
+again. Entries live in a small in-memory LRU and, optionally, in a SQLite file
+that survives restarts. Every entry has its own time-to-live, and both tiers
+evict the least recently used entries when they grow past their size budget.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(model, messages, extra_body=None):
+    payload = json.dumps(
+        {"model": model, "messages": messages, "extra_body": extra_body or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_entries=256, max_bytes=8 * 1024 * 1024, default_ttl=3600,
+                 db_path=None, db_max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.db_max_bytes = db_max_bytes
+        self._lock = threading.Lock()
+        # key -> (value, expires_at, size)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+            self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    return value
+                self._drop_memory(key)
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            # Promote to the memory tier for the next lookup
+            self._put_memory(key, value, expires_at)
+            return value
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._put_memory(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at, size, last_used)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, value, expires_at, len(value.encode("utf-8")), now),
+                )
+                self._evict_db(now)
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _put_memory(self, key, value, expires_at):
+        size = len(value.encode("utf-8"))
+        if key in self._memory:
+            self._drop_memory(key)
+        if size > self.max_bytes:
+            return
+        self._memory[key] = (value, expires_at, size)
+        self._memory_bytes += size
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            oldest_key = next(iter(self._memory))
+            self._drop_memory(oldest_key)
+
+    def _drop_memory(self, key):
+        _, _, size = self._memory.pop(key)
+        self._memory_bytes -= size
+
+    def _evict_db(self, now):
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.db_max_bytes:
+            return
+        # Walk from least to most recently used until we are under budget
+        to_delete = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if total <= self.db_max_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", to_delete)
@@ -1,6 +1,12 @@
 import streamlit as st
-from PIL import Image, ImageDraw, ImageFont
+import hashlib
 import io
+import os
+import tempfile
+import time
+import weakref
+from card_renderer import (HEADER_COLOR, CardTemplate, PhotoSource, iter_rendered_cards, iter_roster,
+                           load_photo, render_card, write_cards_pdf, write_cards_zip)
 
 st.set_page_config(
     page_title="Student Card Generator", 
@@ -8,97 +14,191 @@ st.set_page_config(
     layout="centered"
 )
 
+@st.cache_resource(max_entries=32)
+def get_card_template(school_name, header_color=HEADER_COLOR):
+    # Fonts and the pre-drawn card background, shared by every session
+    return CardTemplate(header_color, school_name)
+
+@st.cache_data(max_entries=64)
+def prepare_photo(photo_hash, _photo_data):
+    # Keyed by the hash of the upload; the bytes themselves are not hashed again
+    return load_photo(_photo_data)
+
+# Finished batch files; each is deleted when its session drops it
+BATCH_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "student_cards")
+# Files left behind by a crash are removed after this long
+BATCH_MAX_AGE_SECONDS = 24 * 3600
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class BatchOutput:
+    def __init__(self, path, file_name, mime, count, photos, errors):
+        self.path = path
+        self.file_name = file_name
+        self.mime = mime
+        self.count = count
+        self.photos = photos
+        self.errors = errors
+        # Runs when a new batch replaces this one or the session ends
+        self.discard = weakref.finalize(self, remove_file, path)
+    
+    def read(self):
+        # Only called when the download button is clicked
+        with open(self.path, "rb") as f:
+            return f.read()
+
+def new_batch_path(extension):
+    os.makedirs(BATCH_OUTPUT_DIR, exist_ok=True)
+    cutoff = time.time() - BATCH_MAX_AGE_SECONDS
+    for entry in os.scandir(BATCH_OUTPUT_DIR):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            remove_file(entry.path)
+    fd, path = tempfile.mkstemp(prefix="student_cards_", suffix=extension, dir=BATCH_OUTPUT_DIR)
+    os.close(fd)
+    return path
+
 st.title("🎓 Student Card Generator")
 st.markdown("---")
 
-camera_photo = st.camera_input("Take Photo (Optional)")
+single_tab, batch_tab = st.tabs(["Single Card", "Batch (Roster CSV)"])
 
-with st.form("student_card_form"):
-    col1, col2 = st.columns(2)
+with single_tab:
+    camera_photo = st.camera_input("Take Photo (Optional)")
+
+    with st.form("student_card_form"):
+        col1, col2 = st.columns(2)
     
-    with col1:
-        student_name = st.text_input("Student Name *", placeholder="e.g. John Smith")
-        school_name = st.text_input("School Name *", placeholder="e.g. High School")
+        with col1:
+            student_name = st.text_input("Student Name *", placeholder="e.g. John Smith")
+            school_name = st.text_input("School Name *", placeholder="e.g. High School")
     
-    with col2:
-        student_number = st.text_input("Student Number *", placeholder="e.g. 2024001")
-        class_form = st.text_input("Class *", placeholder="e.g. 3A")
+        with col2:
+            student_number = st.text_input("Student Number *", placeholder="e.g. 2024001")
+            class_form = st.text_input("Class *", placeholder="e.g. 3A")
     
-    submitted = st.form_submit_button("Generate Student Card", type="primary", use_container_width=True)
+        submitted = st.form_submit_button("Generate Student Card", type="primary", use_container_width=True)
 
-if submitted:
-    if not all([student_name, student_number, school_name, class_form]):
-        st.error("Please fill in all required fields (marked with *)")
-    else:
-        # Create student card
-        card_width, card_height = 450, 280
-        card = Image.new('RGB', (card_width, card_height), color='white')
-        draw = ImageDraw.Draw(card)
-        
-        # Use default fonts (simpler)
-        title_font = ImageFont.load_default()
-        text_font = ImageFont.load_default()
-        small_font = ImageFont.load_default()
-        
-        # Draw header
-        header_color = '#2563eb'
-        draw.rectangle([(0, 0), (card_width, 70)], fill=header_color)
-        draw.text((20, 25), "STUDENT CARD", fill='white', font=title_font)
-        draw.text((20, 50), school_name, fill='white', font=small_font)
-        
-        # Draw photo
-        photo_size = 90
-        photo_x, photo_y = 20, 90
-        if camera_photo:
-            try:
-                photo = Image.open(camera_photo)
-                width, height = photo.size
-                size = min(width, height)
-                left = (width - size) // 2
-                top = (height - size) // 2
-                photo = photo.crop((left, top, left + size, top + size))
-                photo = photo.resize((photo_size, photo_size))
-                card.paste(photo, (photo_x, photo_y))
-            except:
-                draw.rectangle([(photo_x, photo_y), (photo_x + photo_size, photo_y + photo_size)], 
-                             outline='#999', width=2)
-                draw.text((photo_x + 25, photo_y + 35), "Photo", fill='#999', font=small_font)
+    if submitted:
+        if not all([student_name, student_number, school_name, class_form]):
+            st.error("Please fill in all required fields (marked with *)")
         else:
-            draw.rectangle([(photo_x, photo_y), (photo_x + photo_size, photo_y + photo_size)], 
-                         outline='#999', width=2)
-            draw.text((photo_x + 25, photo_y + 35), "Photo", fill='#999', font=small_font)
-        
-        # Draw student information
-        info_x = 130
-        y_offset = 95
-        
-        draw.text((info_x, y_offset), f"Name: {student_name}", fill='black', font=text_font)
-        draw.text((info_x, y_offset + 30), f"Student No.: {student_number}", fill='black', font=text_font)
-        draw.text((info_x, y_offset + 60), f"Class: {class_form}", fill='black', font=text_font)
+            # Static parts come from the cached template; only this student's details are drawn
+            template = get_card_template(school_name)
         
-        # Draw school name at bottom
-        draw.text((20, 250), f"School: {school_name}", fill='#666', font=small_font)
+            # Photo thumbnail, reused if the same photo is submitted again
+            photo = None
+            if camera_photo:
+                photo_data = camera_photo.getvalue()
+                try:
+                    photo = prepare_photo(hashlib.sha256(photo_data).hexdigest(), photo_data)
+                except (OSError, ValueError):
+                    photo = None  # Unreadable photo: show the placeholder
         
-        # Draw border
-        draw.rectangle([(0, 0), (card_width-1, card_height-1)], outline='black', width=2)
+            card = render_card(template, {
+                "name": student_name,
+                "number": student_number,
+                "school": school_name,
+                "class": class_form,
+            }, photo)
         
-        # Convert to bytes for display
-        img_buffer = io.BytesIO()
-        card.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
+            # Convert to bytes for display
+            img_buffer = io.BytesIO()
+            card.save(img_buffer, format='PNG')
+            img_buffer.seek(0)
         
-        # Display the card
-        st.success("Student card generated successfully!")
+            # Display the card
+            st.success("Student card generated successfully!")
         
-        col_img1, col_img2, col_img3 = st.columns([1, 2, 1])
-        with col_img2:
-            st.image(img_buffer, caption="Generated Student Card", use_container_width=False)
+            col_img1, col_img2, col_img3 = st.columns([1, 2, 1])
+            with col_img2:
+                st.image(img_buffer, caption="Generated Student Card", use_container_width=False)
         
-        # Download button
+            # Download button
+            st.download_button(
+                label="Download Student Card",
+                data=img_buffer,
+                file_name=f"{student_number}_student_card.png",
+                mime="image/png",
+                use_container_width=True
+            )
+
+with batch_tab:
+    st.caption("Roster columns: name, number, class, and optionally school and photo. "
+               "Photos are matched by the photo column or the student number (e.g. 2024001.jpg).")
+    roster_file = st.file_uploader("Roster CSV *", type=["csv"])
+    photos_zip = st.file_uploader("Photos (zip)", type=["zip"])
+    photos_folder = st.text_input("...or a photo folder on this computer", placeholder="e.g. D:/intake/photos")
+    default_school = st.text_input("School (for rows without one)", placeholder="e.g. High School")
+    output_format = st.radio("Download as", ["ZIP of PNG cards", "PDF (one card per page)"], horizontal=True)
+    
+    if st.button("Generate All Cards", type="primary", use_container_width=True):
+        if roster_file is None:
+            st.error("Please upload a roster CSV")
+        elif photos_folder and not os.path.isdir(photos_folder):
+            st.error(f"Photo folder not found: {photos_folder}")
+        else:
+            students, errors = [], []
+            roster = io.StringIO(roster_file.getvalue().decode("utf-8-sig"), newline="")
+            for line_number, student, error in iter_roster(roster, default_school):
+                if error:
+                    errors.append(f"Line {line_number}: {error}")
+                else:
+                    students.append(student)
+            
+            if not students:
+                st.error("No valid students in the roster")
+            else:
+                as_pdf = output_format.startswith("PDF")
+                extension = ".pdf" if as_pdf else ".zip"
+                output_path = new_batch_path(extension)
+                
+                progress_bar = st.progress(0.0, text="Rendering cards...")
+                
+                def track(cards):
+                    for done, card in enumerate(cards, 1):
+                        if done % 25 == 0 or done == len(students):
+                            progress_bar.progress(done / len(students), text=f"Rendered {done}/{len(students)} cards")
+                        yield card
+                
+                # Cards are written to the file as they are rendered
+                photos = PhotoSource(folder=photos_folder or None, zip_file=photos_zip)
+                try:
+                    cards = iter_rendered_cards(students, photos, image_format="JPEG" if as_pdf else "PNG")
+                    count = (write_cards_pdf if as_pdf else write_cards_zip)(track(cards), output_path)
+                except BaseException:
+                    remove_file(output_path)
+                    raise
+                finally:
+                    photos.close()
+                
+                previous = st.session_state.get("batch_output")
+                if previous is not None:
+                    previous.discard()
+                st.session_state.batch_output = BatchOutput(
+                    output_path,
+                    file_name=f"student_cards{extension}",
+                    mime="application/pdf" if as_pdf else "application/zip",
+                    count=count,
+                    photos=len(photos),
+                    errors=errors,
+                )
+    
+    batch_output = st.session_state.get("batch_output")
+    if batch_output is not None and os.path.exists(batch_output.path):
+        st.success(f"{batch_output.count} student cards generated ({batch_output.photos} photos found)")
+        if batch_output.errors:
+            with st.expander(f"{len(batch_output.errors)} roster rows skipped"):
+                st.text("\n".join(batch_output.errors))
+        # The file is read only when the button is clicked, not on every rerun
         st.download_button(
-            label="Download Student Card",
-            data=img_buffer,
-            file_name=f"{student_number}_student_card.png",
-            mime="image/png",
+            label="Download All Cards",
+            data=batch_output.read,
+            file_name=batch_output.file_name,
+            mime=batch_output.mime,
+            on_click="ignore",
             use_container_width=True
         )
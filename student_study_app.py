@@ -1,16 +1,11 @@
 
-import os
 import streamlit as st
-import openai
-from dotenv import load_dotenv
+from llm_client import API_KEY, get_client
 
-load_dotenv()
-API_KEY = os.getenv("API_KEY")
-
-# Initialize OpenAI client (only if API_KEY is present)
+# Shared OpenAI client (only if API_KEY is present)
 client = None
 if API_KEY:
-    client = openai.OpenAI(api_key=API_KEY, base_url="https://api.poe.com/v1")
+    client = get_client()
 # Page configuration
 st.set_page_config(page_title="AI Plan Helper", page_icon="💬", layout="wide")
 
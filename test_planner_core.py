@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+
+from planner_core import format_schedule_lines, schedule_assignments
+
+MONDAY = date(2026, 10, 12)
+PREFERENCES = {"daily_study_hours": 4, "focus_hours": 1.5}
+
+
+def plan_one(hours, days_until_due):
+    assignment = {"course": "Math", "task": "Problem set", "priority": "High", "hours": hours,
+                  "due_date": (MONDAY + timedelta(days=days_until_due)).isoformat()}
+    return schedule_assignments([assignment], PREFERENCES, today=MONDAY)
+
+
+def test_fractional_hours_that_fit_leave_nothing_unscheduled():
+    # These split into sums that are a few 1e-16 short of the hours asked for
+    for hours, days_until_due in [(2.0, 3), (9.3, 16), (8.5, 9)]:
+        plan = plan_one(hours, days_until_due)
+        task_plan = plan['tasks'][0]
+        assert task_plan['unscheduled_hours'] == 0
+        assert abs(sum(s['hours'] for s in task_plan['sessions']) - hours) < 1e-6
+        assert not any("do not fit" in line for line in format_schedule_lines(plan))
+
+
+def test_hours_that_do_not_fit_are_reported():
+    # Due tomorrow: only today's 1.5 focus hours are available
+    plan = plan_one(2.5, 1)
+    assert plan['tasks'][0]['unscheduled_hours'] == 1.0
+    assert any("1.0 hours do not fit" in line for line in format_schedule_lines(plan))
@@ -0,0 +1,24 @@
+from planner_io import import_assignments, write_sessions_ics
+
+SESSIONS = [
+    {"date": "2026-10-20", "course": "Math", "task": "Problem set", "hours": 1.5, "priority": "High"},
+    {"date": "2026-10-23", "course": "中文", "task": "閱讀理解練習" * 8, "hours": 2.0, "priority": "Low"},
+]
+
+
+def test_ics_export_round_trip_keeps_dates(tmp_path):
+    path = tmp_path / "plan.ics"
+    write_sessions_ics(SESSIONS, str(path))
+    assignments, errors = import_assignments(str(path))
+    assert errors == []
+    assert [a['due_date'] for a in assignments] == ["2026-10-20", "2026-10-23"]
+    assert assignments[1]['course'] == "中文"
+    assert "閱讀理解練習" * 8 in assignments[1]['task']
+
+
+def test_ics_lines_fold_at_75_octets(tmp_path):
+    path = tmp_path / "plan.ics"
+    write_sessions_ics(SESSIONS, str(path))
+    lines = path.read_bytes().split(b"\r\n")
+    assert max(len(line) for line in lines) <= 75
+    assert any(line.startswith(b" ") for line in lines)
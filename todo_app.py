@@ -1,5 +1,15 @@
 import streamlit as st
+import html
+import io
+import os
 from datetime import datetime
+from functools import partial
+from itertools import islice
+from todo_db import TodoDatabase
+from todo_store import parse_task_csv, parse_tasks, write_tasks_csv, write_tasks_json
+
+# SQLite file shared by every session (and every Streamlit worker process)
+TODO_DB_PATH = os.getenv("TODO_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "todo.db"))
 
 st.set_page_config(
     page_title="To-Do List App", 
@@ -16,7 +26,7 @@ st.markdown("""
         padding: 1rem;
         border-radius: 0.5rem;
         border-left: 4px solid #1f77b4;
-        margin: 0.5rem 0;
+        margin: 0.5rem 0 1rem 0;
     }
     .completed-task {
         opacity: 0.6;
@@ -28,12 +38,43 @@ st.title("✅ To-Do List App")
 st.caption("Stay organized and get things done!")
 st.markdown("---")
 
-# Initialize session state
-if "todos" not in st.session_state:
-    st.session_state.todos = []
+@st.cache_resource
+def get_database():
+    return TodoDatabase(TODO_DB_PATH)
+
+db = get_database()
+
+# Each list name is its own namespace; it is kept in the URL (?user=...)
+# so every tab opened with the same link shows the same list
+with st.sidebar:
+    user = st.text_input("👤 List Name", value=st.query_params.get("user", "default")).strip() or "default"
+    st.query_params["user"] = user
+
+def export_tasks(store, export_format):
+    # Rows are written one at a time straight from the store
+    buffer = io.StringIO(newline="")
+    (write_tasks_csv if export_format == "CSV" else write_tasks_json)(store, buffer)
+    return buffer.getvalue()
 
-if "completed" not in st.session_state:
-    st.session_state.completed = []
+def save_changes():
+    # Write-behind: clicks only change the in-memory store; the queued changes
+    # are written in one transaction at the end of the run, or at the start of
+    # the next one when a click ended the run early with st.rerun()
+    if "todo_store" not in st.session_state:
+        return
+    version, in_sync = db.save(st.session_state.todo_user, st.session_state.todo_store.pop_changes(),
+                               st.session_state.todo_version)
+    # If another session wrote in between, reload below
+    st.session_state.todo_version = version if in_sync else None
+
+save_changes()
+
+# Reload only if the list changed since this session loaded it
+if st.session_state.get("todo_user") != user or db.version(user) != st.session_state.get("todo_version"):
+    st.session_state.todo_store, st.session_state.todo_version = db.load(user)
+    st.session_state.todo_user = user
+
+store = st.session_state.todo_store
 
 # Sidebar for adding new tasks
 with st.sidebar:
@@ -63,111 +104,215 @@ with st.sidebar:
     
     if add_clicked:
         if new_task.strip():
-            task_data = {
-                "id": len(st.session_state.todos) + len(st.session_state.completed) + 1,
-                "task": new_task.strip(),
-                "priority": priority_level,
-                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")
-            }
-            st.session_state.todos.append(task_data)
+            store.add(new_task.strip(), priority_level)
             st.success("✅ Task added!")
             st.rerun()
         else:
             st.warning("⚠️ Please enter a task description!")
     
     if clear_all:
-        if st.session_state.todos or st.session_state.completed:
-            st.session_state.todos = []
-            st.session_state.completed = []
+        if store.total:
+            store.clear()
             st.success("🗑️ All tasks cleared!")
             st.rerun()
     
+    # Many tasks at once, added in a single batch
+    with st.expander("📥 Bulk Add"):
+        bulk_text = st.text_area(
+            "One task per line",
+            placeholder="Finish essay !high\nRead chapter 3 !med\nTidy desk !low",
+            help="Add !high, !med or !low to a line to set its priority"
+        )
+        bulk_file = st.file_uploader("...or upload a .txt or .csv file", type=["txt", "csv"])
+        bulk_priority = st.selectbox("Default priority", ["Low", "Medium", "High"], key="bulk_priority")
+        
+        if st.button("📥 Add All", use_container_width=True):
+            try:
+                items = list(parse_tasks(bulk_text, bulk_priority))
+                if bulk_file is not None:
+                    content = bulk_file.getvalue().decode("utf-8-sig")
+                    if bulk_file.name.lower().endswith(".csv"):
+                        items.extend(parse_task_csv(io.StringIO(content, newline=""), bulk_priority))
+                    else:
+                        items.extend(parse_tasks(content, bulk_priority))
+            except (UnicodeDecodeError, ValueError) as e:
+                st.error(f"⚠️ Could not read the file: {e}")
+            else:
+                if items:
+                    store.add_many(items)
+                    st.toast(f"✅ {len(items)} tasks added!")
+                    st.rerun()
+                else:
+                    st.warning("⚠️ No tasks found to add!")
+    
+    # Export is only built when the download button is clicked
+    with st.expander("📤 Export"):
+        export_format = st.radio("Format", ["CSV", "JSON"], horizontal=True)
+        st.download_button(
+            label=f"⬇️ Download {export_format}",
+            data=partial(export_tasks, store, export_format),
+            file_name=f"todos_{datetime.now().strftime('%Y%m%d_%H%M')}.{export_format.lower()}",
+            mime="text/csv" if export_format == "CSV" else "application/json",
+            on_click="ignore",
+            disabled=not store.total,
+            use_container_width=True
+        )
+    
     st.markdown("---")
     st.markdown("### 📊 Quick Stats")
-    st.metric("Total", len(st.session_state.todos) + len(st.session_state.completed))
-    st.metric("Pending", len(st.session_state.todos))
-    st.metric("Done", len(st.session_state.completed))
+    st.metric("Total", store.total)
+    st.metric("Pending", store.pending_count)
+    st.metric("Done", store.completed_count)
+
+# Priority color coding
+PRIORITY_INFO = {
+    "High": {"emoji": "🔴", "color": "#dc3545"},
+    "Medium": {"emoji": "🟡", "color": "#ffc107"},
+    "Low": {"emoji": "🟢", "color": "#28a745"}
+}
+PAGE_SIZES = [10, 25, 50, 100]
+
+if "todo_page" not in st.session_state:
+    st.session_state.todo_page = 0
+
+def change_page(step):
+    st.session_state.todo_page += step
+
+def reset_page():
+    st.session_state.todo_page = 0
+
+def select_tasks(task_ids, selected):
+    for task_id in task_ids:
+        st.session_state[f"select_{task_id}"] = selected
 
 # Main content area
 col1, col2 = st.columns(2)
 
 # Pending tasks
 with col1:
-    st.subheader(f"📋 Pending Tasks ({len(st.session_state.todos)})")
+    st.subheader(f"📋 Pending Tasks ({store.pending_count})")
     
-    if st.session_state.todos:
-        for todo in st.session_state.todos:
-            # Priority color coding
-            priority_info = {
-                "High": {"emoji": "🔴", "color": "#dc3545"},
-                "Medium": {"emoji": "🟡", "color": "#ffc107"},
-                "Low": {"emoji": "🟢", "color": "#28a745"}
-            }
-            
-            p_info = priority_info.get(todo['priority'], {"emoji": "⚪", "color": "#6c757d"})
+    if store.pending_count:
+        # Only the tasks on the current page get widgets
+        col_search, col_filter = st.columns([2, 1])
+        with col_search:
+            search = st.text_input("🔍 Search", placeholder="Filter tasks...", on_change=reset_page)
+        with col_filter:
+            priority_filter = st.selectbox("Priority", ["All"] + list(PRIORITY_INFO), on_change=reset_page)
+        col_sort, col_size = st.columns([2, 1])
+        with col_sort:
+            sort_by = st.radio("Sort by", ["Oldest first", "Priority"], horizontal=True, on_change=reset_page)
+        with col_size:
+            page_size = st.selectbox("Per page", PAGE_SIZES, index=1, on_change=reset_page)
+        
+        page_tasks, matches = store.find_pending(
+            page=st.session_state.todo_page,
+            page_size=page_size,
+            priority=None if priority_filter == "All" else priority_filter,
+            search=search.strip(),
+            by_priority=sort_by == "Priority"
+        )
+        page_count = max(1, -(-matches // page_size))
+        if st.session_state.todo_page >= page_count:
+            # The last page emptied (e.g. its last task was completed)
+            st.session_state.todo_page = page_count - 1
+            st.rerun()
+        
+        # Bulk actions on the ticked tasks of this page, applied in one batch
+        page_ids = [todo['id'] for todo in page_tasks]
+        selected = [task_id for task_id in page_ids if st.session_state.get(f"select_{task_id}")]
+        col_all, col_done, col_remove = st.columns(3)
+        with col_all:
+            all_selected = bool(page_ids) and len(selected) == len(page_ids)
+            st.button("☐ Clear Selection" if all_selected else "☑️ Select Page", on_click=select_tasks,
+                      args=(page_ids, not all_selected), use_container_width=True, disabled=not page_ids)
+        with col_done:
+            if st.button(f"✓ Complete ({len(selected)})", use_container_width=True, disabled=not selected):
+                store.complete_many(selected)
+                st.rerun()
+        with col_remove:
+            if st.button(f"🗑️ Delete ({len(selected)})", use_container_width=True, disabled=not selected):
+                store.delete_many(selected)
+                st.rerun()
+        
+        for todo in page_tasks:
+            p_info = PRIORITY_INFO.get(todo['priority'], {"emoji": "⚪", "color": "#6c757d"})
             
             with st.container():
                 st.markdown(f"""
                 <div class="task-card">
                     <h4 style="margin: 0;">
-                        {p_info['emoji']} {todo['task']}
+                        {p_info['emoji']} {html.escape(todo['task'])}
                     </h4>
                     <p style="margin: 0.5rem 0 0 0; color: #666; font-size: 0.9em;">
-                        Priority: <strong style="color: {p_info['color']};">{todo['priority']}</strong> | 
-                        Created: {todo['created_at']}
+                        Priority: <strong style="color: {p_info['color']};">{html.escape(todo['priority'])}</strong> | 
+                        Created: {html.escape(todo['created_at'])}
                     </p>
                 </div>
                 """, unsafe_allow_html=True)
                 
-                col_a, col_b = st.columns([1, 1])
+                col_select, col_a, col_b = st.columns([1, 2, 2])
+                with col_select:
+                    st.checkbox("Select", key=f"select_{todo['id']}")
                 with col_a:
                     if st.button("✓ Complete", key=f"complete_{todo['id']}", use_container_width=True):
-                        todo['completed_at'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                        st.session_state.completed.append(todo)
-                        st.session_state.todos.remove(todo)
+                        store.complete(todo['id'])
                         st.rerun()
                 with col_b:
                     if st.button("🗑️ Delete", key=f"delete_{todo['id']}", use_container_width=True):
-                        st.session_state.todos.remove(todo)
+                        store.delete(todo['id'])
                         st.rerun()
-                
-                st.markdown("<br>", unsafe_allow_html=True)
+        
+        if not page_tasks:
+            st.info("No tasks match this filter.")
+        
+        # Page navigation
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("◀ Prev", on_click=change_page, args=(-1,), use_container_width=True,
+                      disabled=st.session_state.todo_page == 0)
+        with col_page:
+            st.caption(f"Page {st.session_state.todo_page + 1} of {page_count} · {matches} matching tasks")
+        with col_next:
+            st.button("Next ▶", on_click=change_page, args=(1,), use_container_width=True,
+                      disabled=st.session_state.todo_page >= page_count - 1)
     else:
         st.info("🎉 No pending tasks! Great job!")
 
 # Completed tasks
 with col2:
-    st.subheader(f"✅ Completed Tasks ({len(st.session_state.completed)})")
+    st.subheader(f"✅ Completed Tasks ({store.completed_count})")
     
-    if st.session_state.completed:
-        for todo in reversed(st.session_state.completed[-10:]):  # Show last 10 completed
+    if store.completed_count:
+        show_completed = st.selectbox("Show last", [10, 25, 50], key="show_completed")
+        # Newest first, straight from the store without copying the list
+        for todo in islice(store.iter_completed(), show_completed):
             st.markdown(f"""
             <div class="task-card completed-task">
                 <p style="margin: 0; text-decoration: line-through;">
-                    ✓ {todo['task']}
+                    ✓ {html.escape(todo['task'])}
                 </p>
                 <p style="margin: 0.5rem 0 0 0; color: #666; font-size: 0.85em;">
-                    Completed: {todo.get('completed_at', 'N/A')}
+                    Completed: {html.escape(todo.get('completed_at', 'N/A'))}
                 </p>
             </div>
             """, unsafe_allow_html=True)
-            st.markdown("<br>", unsafe_allow_html=True)
     else:
         st.info("No completed tasks yet. Start checking off tasks!")
 
 # Bottom statistics bar
-if st.session_state.todos or st.session_state.completed:
+if store.total:
     st.markdown("---")
     col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
     
-    total = len(st.session_state.todos) + len(st.session_state.completed)
-    completion_rate = (len(st.session_state.completed) / total * 100) if total > 0 else 0
-    
     with col_stat1:
-        st.metric("📝 Total Tasks", total)
+        st.metric("📝 Total Tasks", store.total)
     with col_stat2:
-        st.metric("⏳ Pending", len(st.session_state.todos))
+        st.metric("⏳ Pending", store.pending_count)
     with col_stat3:
-        st.metric("✅ Completed", len(st.session_state.completed))
+        st.metric("✅ Completed", store.completed_count)
     with col_stat4:
-        st.metric("📈 Completion Rate", f"{completion_rate:.1f}%")
+        st.metric("📈 Completion Rate", f"{store.completion_rate:.1f}%")
+
+# Anything still queued is saved once the page has been drawn
+save_changes()
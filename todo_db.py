@@ -0,0 +1,149 @@
+"""
+SQLite storage for todo_app.py.
+
+Every user (list name) has its own rows in one shared database file, so any
+number of Streamlit sessions or worker processes can use the same file (WAL
+mode, writers take turns with BEGIN IMMEDIATE). Each user also has a version
+number that goes up with every saved batch of changes: a session compares it
+with the version it loaded and only reloads the tasks when someone else has
+written since. New task ids are handed out in blocks so sessions never pick
+the same id. The app saves write-behind: changes queue up in the session's
+TaskStore and are written in one save() per script run.
+"""
+
+import sqlite3
+import threading
+
+from todo_store import TaskStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todo_users (
+    user TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    next_id INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS todos (
+    user TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    task TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    completed_order INTEGER,
+    PRIMARY KEY (user, id)
+);
+"""
+
+# Task ids reserved per session at a time
+ID_BLOCK = 100
+BUSY_TIMEOUT_MS = 5000
+CHANGES_PER_VERSION = 1_000_000
+
+
+class TodoDatabase:
+    def __init__(self, path):
+        # One connection shared by the Streamlit threads of this process
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                                    timeout=BUSY_TIMEOUT_MS / 1000)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    def version(self, user):
+        with self.lock:
+            row = self.conn.execute("SELECT version FROM todo_users WHERE user = ?", (user,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, user):
+        """Return (TaskStore with the user's tasks, version it was read at)."""
+        store = TaskStore(reserve_ids=lambda: self.reserve_ids(user), track_changes=True)
+        with self.lock:
+            # One read transaction so the version matches the rows
+            self.conn.execute("BEGIN")
+            try:
+                row = self.conn.execute("SELECT version FROM todo_users WHERE user = ?", (user,)).fetchone()
+                rows = self.conn.execute(
+                    "SELECT id, task, priority, created_at, completed_at FROM todos WHERE user = ?"
+                    " ORDER BY completed_order IS NOT NULL, completed_order, id",
+                    (user,),
+                ).fetchall()
+            finally:
+                self.conn.execute("COMMIT")
+        for task_id, text, priority, created_at, completed_at in rows:
+            task = {"id": task_id, "task": text, "priority": priority, "created_at": created_at}
+            if completed_at:
+                task['completed_at'] = completed_at
+            store.restore(task)
+        return store, (row[0] if row else 0)
+
+    def reserve_ids(self, user, count=ID_BLOCK):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._ensure_user(user)
+                start = self.conn.execute("SELECT next_id FROM todo_users WHERE user = ?",
+                                          (user,)).fetchone()[0]
+                self.conn.execute("UPDATE todo_users SET next_id = ? WHERE user = ?", (start + count, user))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return range(start, start + count)
+
+    def save(self, user, changes, known_version):
+        """
+        Write a batch of TaskStore changes in one transaction.
+
+        Returns (new version, in_sync); in_sync is False when another
+        session had written since `known_version`, so the caller should
+        reload instead of trusting its own copy.
+        """
+        if not changes:
+            return known_version, True
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._ensure_user(user)
+                version = self.conn.execute("SELECT version FROM todo_users WHERE user = ?",
+                                            (user,)).fetchone()[0]
+                # Completion order: batch version first, then position in the batch
+                for position, change in enumerate(changes):
+                    self._apply(user, change, (version + 1) * CHANGES_PER_VERSION + position)
+                self.conn.execute("UPDATE todo_users SET version = ? WHERE user = ?", (version + 1, user))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return version + 1, version == known_version
+
+    def _ensure_user(self, user):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO todo_users (user, next_id)"
+            " SELECT ?, COALESCE(MAX(id), 0) + 1 FROM todos WHERE user = ?",
+            (user, user),
+        )
+
+    def _apply(self, user, change, order):
+        kind = change[0]
+        if kind == "add":
+            task = change[1]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO todos (user, id, task, priority, created_at) VALUES (?, ?, ?, ?, ?)",
+                (user, task['id'], task['task'], task['priority'], task['created_at']),
+            )
+        elif kind == "complete":
+            self.conn.execute(
+                "UPDATE todos SET completed_at = ?, completed_order = ?"
+                " WHERE user = ? AND id = ? AND completed_at IS NULL",
+                (change[2], order, user, change[1]),
+            )
+        elif kind == "delete":
+            self.conn.execute("DELETE FROM todos WHERE user = ? AND id = ?", (user, change[1]))
+        elif kind == "clear":
+            self.conn.execute("DELETE FROM todos WHERE user = ?", (user,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,251 @@
+"""
+In-memory task store for todo_app.py.
+
+Tasks are the same dicts the app always used ({"id", "task", "priority",
+"created_at"} plus "completed_at" once done). Ids only ever go up, so a
+deleted task's id is never handed out again. Pending and completed tasks are
+kept in dicts keyed by id (which remember insertion order, i.e. creation and
+completion order), with one more dict per priority as an ordered index, so
+completing or deleting a task never scans a list. Counts are kept up to date
+as tasks move instead of being recomputed.
+
+With track_changes=True every add/complete/delete/clear is also recorded so
+todo_db.TodoDatabase can write them out later in one batch, and
+`reserve_ids` lets ids come in blocks shared with other sessions.
+
+The module also reads tasks pasted or uploaded in bulk (one per line, with
+an optional "!high", "!med" or "!low" word anywhere in the line, or a CSV
+with task/priority columns) and writes tasks out as CSV or JSON row by row.
+"""
+
+import csv
+import json
+import re
+from datetime import datetime
+from itertools import islice
+
+PRIORITIES = ("High", "Medium", "Low")
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+EXPORT_FIELDS = ("id", "task", "priority", "status", "created_at", "completed_at")
+
+PRIORITY_TAGS = {"high": "High", "h": "High", "medium": "Medium", "med": "Medium", "m": "Medium",
+                 "low": "Low", "l": "Low"}
+_PRIORITY_TAG = re.compile(r"(?<!\S)!(high|medium|med|low|h|m|l)\b", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)]|\[[ xX]?\])\s+")
+
+
+class TaskStore:
+    def __init__(self, reserve_ids=None, track_changes=False):
+        # reserve_ids() returns a range of unused ids; without it ids start at 1
+        self.reserve_ids = reserve_ids
+        self.next_id = 1
+        self.id_limit = 0 if reserve_ids is not None else None
+        # Changes not yet saved: ("add", task), ("complete", id, completed_at),
+        # ("delete", id) or ("clear",)
+        self.changes = [] if track_changes else None
+        self._reset()
+
+    def _reset(self):
+        self.pending = {}    # id -> task, in creation order
+        self.completed = {}  # id -> task, in completion order
+        # priority -> {id: None}, pending tasks in creation order
+        self.by_priority = {priority: {} for priority in PRIORITIES}
+        self.pending_count = 0
+        self.completed_count = 0
+        self.priority_counts = {priority: 0 for priority in PRIORITIES}
+
+    @property
+    def total(self):
+        return self.pending_count + self.completed_count
+
+    @property
+    def completion_rate(self):
+        return self.completed_count / self.total * 100 if self.total else 0.0
+
+    def get(self, task_id):
+        return self.pending.get(task_id) or self.completed.get(task_id)
+
+    def add(self, text, priority, created_at=None):
+        if self.id_limit is not None and self.next_id >= self.id_limit:
+            block = self.reserve_ids()
+            self.next_id, self.id_limit = block.start, block.stop
+        task = {
+            "id": self.next_id,
+            "task": text,
+            "priority": priority if priority in PRIORITIES else "Low",
+            "created_at": created_at or datetime.now().strftime(TIME_FORMAT),
+        }
+        self.next_id += 1
+        self._add_pending(task)
+        self._record("add", task)
+        return task
+
+    def add_many(self, items, created_at=None):
+        """Add (text, priority) pairs; returns the new tasks."""
+        created_at = created_at or datetime.now().strftime(TIME_FORMAT)
+        return [self.add(text, priority, created_at) for text, priority in items]
+
+    def complete_many(self, task_ids):
+        completed_at = datetime.now().strftime(TIME_FORMAT)
+        return [task for task in (self.complete(task_id, completed_at) for task_id in task_ids) if task]
+
+    def delete_many(self, task_ids):
+        return [task for task in map(self.delete, task_ids) if task]
+
+    def restore(self, task):
+        """Put back a saved task (pending or completed) without recording it."""
+        if task.get('completed_at'):
+            self.completed[task['id']] = task
+            self.completed_count += 1
+        else:
+            self._add_pending(task)
+        if self.id_limit is None:
+            self.next_id = max(self.next_id, task['id'] + 1)
+
+    def complete(self, task_id, completed_at=None):
+        task = self._remove_pending(task_id)
+        if task is None:
+            return None
+        task['completed_at'] = completed_at or datetime.now().strftime(TIME_FORMAT)
+        self.completed[task_id] = task
+        self.completed_count += 1
+        self._record("complete", task_id, task['completed_at'])
+        return task
+
+    def delete(self, task_id):
+        task = self._remove_pending(task_id)
+        if task is None:
+            task = self.completed.pop(task_id, None)
+            if task is not None:
+                self.completed_count -= 1
+        if task is not None:
+            self._record("delete", task_id)
+        return task
+
+    def clear(self):
+        # Ids keep counting up so old widget keys are never reused
+        self._reset()
+        self._record("clear")
+
+    def pop_changes(self):
+        if not self.changes:
+            return []
+        changes, self.changes = self.changes, []
+        return changes
+
+    def _record(self, *change):
+        if self.changes is not None:
+            self.changes.append(change)
+
+    def iter_pending(self, priority=None):
+        """Pending tasks oldest first, optionally only one priority."""
+        if priority is None:
+            return iter(self.pending.values())
+        return (self.pending[task_id] for task_id in self.by_priority.get(priority, {}))
+
+    def iter_pending_by_priority(self):
+        """Pending tasks High first, oldest first within each priority."""
+        for priority in PRIORITIES:
+            yield from self.iter_pending(priority)
+
+    def find_pending(self, page=0, page_size=25, priority=None, search="", by_priority=False):
+        """
+        Return (tasks on `page`, number of matching tasks).
+
+        Without a search the count comes from the counters and only the
+        requested page is walked; with one, every pending task is checked
+        once (case-insensitive substring) while the page is collected.
+        """
+        if by_priority and priority is None:
+            tasks = self.iter_pending_by_priority()
+        else:
+            tasks = self.iter_pending(priority)
+        start = page * page_size
+        if not search:
+            matches = self.pending_count if priority is None else self.priority_counts.get(priority, 0)
+            return list(islice(tasks, start, start + page_size)), matches
+
+        needle = search.casefold()
+        page_tasks, matches = [], 0
+        for task in tasks:
+            if needle in task['task'].casefold():
+                if start <= matches < start + page_size:
+                    page_tasks.append(task)
+                matches += 1
+        return page_tasks, matches
+
+    def iter_completed(self, newest_first=True):
+        return reversed(self.completed.values()) if newest_first else iter(self.completed.values())
+
+    def _add_pending(self, task):
+        self.pending[task['id']] = task
+        self.by_priority[task['priority']][task['id']] = None
+        self.pending_count += 1
+        self.priority_counts[task['priority']] += 1
+
+    def _remove_pending(self, task_id):
+        task = self.pending.pop(task_id, None)
+        if task is not None:
+            del self.by_priority[task['priority']][task_id]
+            self.pending_count -= 1
+            self.priority_counts[task['priority']] -= 1
+        return task
+
+
+def parse_task_line(line, default_priority="Low"):
+    """Return (text, priority) for one pasted line, or None if it is blank."""
+    priority = default_priority
+    match = _PRIORITY_TAG.search(line)
+    if match:
+        priority = PRIORITY_TAGS[match.group(1).lower()]
+        line = _PRIORITY_TAG.sub("", line)
+    text = " ".join(_BULLET.sub("", line).split())
+    return (text, priority) if text else None
+
+
+def parse_tasks(text, default_priority="Low"):
+    """Yield (text, priority) for every non-blank line of pasted text."""
+    for line in text.splitlines():
+        parsed = parse_task_line(line, default_priority)
+        if parsed:
+            yield parsed
+
+
+def parse_task_csv(f, default_priority="Low"):
+    """Yield (text, priority) from a CSV with a task (or description) column."""
+    reader = csv.DictReader(f)
+    columns = {(name or "").strip().lower(): name for name in reader.fieldnames or []}
+    task_column = columns.get("task") or columns.get("description") or columns.get("title")
+    priority_column = columns.get("priority")
+    if task_column is None:
+        raise ValueError("the CSV needs a 'task' column")
+    for record in reader:
+        parsed = parse_task_line(record.get(task_column) or "", default_priority)
+        if parsed is None:
+            continue
+        priority = (record.get(priority_column) or "").strip().lower() if priority_column else ""
+        yield parsed[0], PRIORITY_TAGS.get(priority, parsed[1])
+
+
+def iter_export_rows(store):
+    """Pending tasks (oldest first) then completed ones (in completion order)."""
+    for status, tasks in (("pending", store.iter_pending()), ("completed", store.iter_completed(False))):
+        for task in tasks:
+            yield {"id": task['id'], "task": task['task'], "priority": task['priority'], "status": status,
+                   "created_at": task['created_at'], "completed_at": task.get('completed_at', "")}
+
+
+def write_tasks_csv(store, f):
+    writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for row in iter_export_rows(store):
+        writer.writerow(row)
+
+
+def write_tasks_json(store, f):
+    # Written one task at a time instead of json.dump() of a full list
+    f.write("[")
+    for number, row in enumerate(iter_export_rows(store)):
+        f.write(",\n  " if number else "\n  ")
+        f.write(json.dumps(row, ensure_ascii=False))
+    f.write("\n]\n")